@@ -0,0 +1,102 @@
+import hashlib
+import sys
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+class ClassificationCache:
+    """
+    LRU-кэш результатов классификации.
+    Ключ - быстрый хэш буфера пикселей (вместе с формой и типом массива),
+    значение - результат классификации [predicted_class, predicted_property].
+    Объем кэша ограничивается по памяти (в мегабайтах), 0 - кэш отключен.
+    """
+
+    # примерные накладные расходы на один элемент OrderedDict (узел, ссылки)
+    ENTRY_OVERHEAD = 100
+
+    def __init__(self, max_memory_mb=64):
+        self.__entries = OrderedDict()
+        self.__entry_sizes = {}
+        self.__memory = 0
+        self.__lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.set_max_memory(max_memory_mb)
+
+    def set_max_memory(self, max_memory_mb):
+        """
+        Изменение ограничения по памяти (лишние элементы сразу вытесняются).
+        """
+        with self.__lock:
+            self.__max_memory = int(max_memory_mb * 1024 * 1024)
+            self.__evict()
+
+    def is_enabled(self):
+        return self.__max_memory > 0
+
+    @staticmethod
+    def make_key(image):
+        """
+        Хэш изображения: учитываются форма, тип и содержимое буфера пикселей.
+        """
+        image = np.ascontiguousarray(image)
+        hasher = hashlib.blake2b(digest_size=16)
+        hasher.update(str((image.shape, image.dtype.str)).encode())
+        hasher.update(memoryview(image).cast('B'))
+        return hasher.digest()
+
+    def get(self, key):
+        """
+        Возвращает сохраненный результат или None (и обновляет счетчики попаданий и промахов).
+        """
+        with self.__lock:
+            value = self.__entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self.__entries.move_to_end(key)
+            self.hits += 1
+            return list(value)
+
+    def put(self, key, value):
+        if not self.is_enabled():
+            return
+        value = tuple(value)
+        size = sys.getsizeof(key) + sys.getsizeof(value) + self.ENTRY_OVERHEAD
+        with self.__lock:
+            if key in self.__entries:
+                self.__memory -= self.__entry_sizes[key]
+            self.__entries[key] = value
+            self.__entries.move_to_end(key)
+            self.__entry_sizes[key] = size
+            self.__memory += size
+            self.__evict()
+
+    def clear(self):
+        with self.__lock:
+            self.__entries.clear()
+            self.__entry_sizes.clear()
+            self.__memory = 0
+            self.hits = 0
+            self.misses = 0
+
+    def get_stats(self):
+        """
+        Статистика кэша: попадания, промахи, число элементов и занимаемая память (в байтах).
+        """
+        with self.__lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'entries': len(self.__entries),
+                'memory': self.__memory,
+                'max_memory': self.__max_memory
+            }
+
+    def __evict(self):
+        # вытесняем самые давно использованные элементы
+        while self.__entries and self.__memory > self.__max_memory:
+            key, _ = self.__entries.popitem(last=False)
+            self.__memory -= self.__entry_sizes.pop(key)
@@ -0,0 +1,209 @@
+"""
+Среды выполнения для классификатора дефектов.
+Все классификаторы принимают пакет float32 формы (N, 224, 224, 3) со значениями в [0, 1]
+(predict_on_batch) и возвращают массив вероятностей (N, число классов) в том же порядке
+классов, что и исходная Keras-модель.
+Облегченные форматы (TFLite, ONNX) экспортируются из .h5 один раз и сохраняются рядом с моделью.
+"""
+import os
+import tempfile
+import threading
+
+import numpy as np
+
+# доступные среды выполнения
+BACKENDS = ('keras', 'tflite', 'tflite_int8', 'onnx')
+
+class KerasClassifier:
+    """
+    Исходная модель tf.keras.
+    """
+
+    def __init__(self, model_path):
+        import tensorflow as tf
+        self.model_path = str(model_path)
+        self.keras_model = tf.keras.models.load_model(self.model_path)
+
+    def predict_on_batch(self, batch):
+        return np.asarray(self.keras_model.predict_on_batch(batch))
+
+
+class TFLiteClassifier:
+    """
+    Модель в формате TFLite (на CPU вычисления идут через XNNPACK).
+    Если рядом с .h5 нет .tflite, он создается при первом запуске.
+    Интерпретатор не потокобезопасен, поэтому вызовы выполняются под блокировкой.
+    """
+
+    def __init__(self, model_path, num_threads=None):
+        self.model_path = str(model_path)
+        self.tflite_path = self.model_path
+        if not self.model_path.endswith('.tflite'):
+            self.tflite_path = export_tflite(self.model_path)
+
+        try:
+            from tflite_runtime.interpreter import Interpreter
+        except ImportError:
+            import tensorflow as tf
+            Interpreter = tf.lite.Interpreter
+        self.interpreter = Interpreter(model_path=self.tflite_path, num_threads=num_threads)
+        self.interpreter.allocate_tensors()
+        self.__input = self.interpreter.get_input_details()[0]
+        self.__output = self.interpreter.get_output_details()[0]
+        self.__batch_size = int(self.__input['shape'][0])
+        self.__lock = threading.Lock()
+
+    def predict_on_batch(self, batch):
+        batch = np.asarray(batch)
+        with self.__lock:
+            # размер пакета меняется только при необходимости (перераспределение памяти дорогое)
+            if len(batch) != self.__batch_size:
+                self.interpreter.resize_tensor_input(self.__input['index'], [len(batch), *batch.shape[1:]])
+                self.interpreter.allocate_tensors()
+                self.__batch_size = len(batch)
+            self.interpreter.set_tensor(self.__input['index'], self.__quantize(batch))
+            self.interpreter.invoke()
+            prediction = self.interpreter.get_tensor(self.__output['index'])
+        return self.__dequantize(prediction)
+
+    def __quantize(self, batch):
+        # для квантованных моделей вход переводится в целые числа по параметрам входного тензора
+        dtype = self.__input['dtype']
+        if dtype == np.float32:
+            return batch.astype(np.float32, copy=False)
+        scale, zero_point = self.__input['quantization']
+        info = np.iinfo(dtype)
+        return np.clip(np.round(batch / scale + zero_point), info.min, info.max).astype(dtype)
+
+    def __dequantize(self, prediction):
+        if self.__output['dtype'] == np.float32:
+            return prediction
+        scale, zero_point = self.__output['quantization']
+        return (prediction.astype(np.float32) - zero_point) * scale
+
+
+class ONNXClassifier:
+    """
+    Модель в формате ONNX, выполняемая в ONNX Runtime на CPU.
+    Если рядом с .h5 нет .onnx, он создается при первом запуске (нужен пакет tf2onnx).
+    """
+
+    def __init__(self, model_path, num_threads=None):
+        import onnxruntime as ort
+        self.model_path = str(model_path)
+        self.onnx_path = self.model_path
+        if not self.model_path.endswith('.onnx'):
+            self.onnx_path = export_onnx(self.model_path)
+
+        options = ort.SessionOptions()
+        if num_threads:
+            options.intra_op_num_threads = int(num_threads)
+        self.session = ort.InferenceSession(self.onnx_path, options, providers=['CPUExecutionProvider'])
+        self.__input_name = self.session.get_inputs()[0].name
+
+    def predict_on_batch(self, batch):
+        batch = np.asarray(batch, dtype=np.float32)
+        return self.session.run(None, {self.__input_name: batch})[0]
+
+
+def exported_path(model_path, ext):
+    """
+    Путь к экспортированной модели: рядом с исходной, с другим расширением.
+    """
+    return os.path.splitext(str(model_path))[0] + ext
+
+def export_tflite(model_path, output_path=None):
+    """
+    Экспорт .h5 в .tflite (если файл уже есть и новее модели - используется он).
+    """
+    output_path = output_path or exported_path(model_path, '.tflite')
+    if _is_fresh(output_path, model_path):
+        return output_path
+
+    import tensorflow as tf
+    keras_model = tf.keras.models.load_model(str(model_path))
+    converter = tf.lite.TFLiteConverter.from_keras_model(keras_model)
+    write_atomic(output_path, converter.convert())
+    return output_path
+
+def export_onnx(model_path, output_path=None):
+    """
+    Экспорт .h5 в .onnx с пакетом переменного размера.
+    """
+    output_path = output_path or exported_path(model_path, '.onnx')
+    if _is_fresh(output_path, model_path):
+        return output_path
+
+    import tensorflow as tf
+    import tf2onnx
+    keras_model = tf.keras.models.load_model(str(model_path))
+    input_signature = [tf.TensorSpec([None, *keras_model.input_shape[1:]], tf.float32, name='input')]
+    onnx_model, _ = tf2onnx.convert.from_keras(keras_model, input_signature=input_signature)
+    write_atomic(output_path, onnx_model.SerializeToString())
+    return output_path
+
+def int8_model_path(model_path):
+    """
+    Путь к INT8-модели (создается инструментом ClassifierQuantization).
+    """
+    return exported_path(model_path, '_int8.tflite')
+
+def create_classifier(backend, model_path, num_threads=None, int8_path=None):
+    """
+    Классификатор для выбранной среды выполнения ('keras', 'tflite', 'tflite_int8' или 'onnx').
+    INT8-модель берется из int8_path (по умолчанию - int8_model_path(model_path));
+    если она еще не создана, используется исходная модель.
+    """
+    if backend == 'keras':
+        return KerasClassifier(model_path)
+    if backend == 'tflite':
+        return TFLiteClassifier(model_path, num_threads=num_threads)
+    if backend == 'tflite_int8':
+        quantized_path = int8_path or int8_model_path(model_path)
+        if not os.path.exists(quantized_path):
+            print('create_classifier', f"нет INT8-модели {quantized_path}, используется исходная")
+            return KerasClassifier(model_path)
+        return TFLiteClassifier(quantized_path, num_threads=num_threads)
+    if backend == 'onnx':
+        return ONNXClassifier(model_path, num_threads=num_threads)
+    raise ValueError(f"Неизвестная среда выполнения классификатора: {backend}")
+
+def compare_predictions(reference, candidate, class_names):
+    """
+    Сравнение вероятностей двух классификаторов на одних и тех же изображениях.
+    Возвращает долю совпавших классов, максимальное расхождение вероятностей
+    и число расхождений по каждому классу эталона.
+    """
+    reference = np.asarray(reference, dtype=np.float32)
+    candidate = np.asarray(candidate, dtype=np.float32)
+    reference_classes = np.argmax(reference, axis=1)
+    candidate_classes = np.argmax(candidate, axis=1)
+    mismatched = reference_classes != candidate_classes
+    return {
+        'samples': len(reference),
+        'agreement': float(1.0 - mismatched.mean()) if len(reference) else 1.0,
+        'max_abs_diff': float(np.abs(reference - candidate).max()) if len(reference) else 0.0,
+        'mismatches': {
+            class_name: int(np.sum(mismatched & (reference_classes == index)))
+            for index, class_name in enumerate(class_names)
+        }
+    }
+
+def _is_fresh(output_path, model_path):
+    return os.path.exists(output_path) and os.path.getmtime(output_path) >= os.path.getmtime(str(model_path))
+
+def write_atomic(path, data):
+    """
+    Запись файла модели целиком или никак.
+    """
+    # сначала во временный файл: при сбое экспорта (или одновременном экспорте
+    # в нескольких процессах) не останется недописанной модели
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as file:
+            file.write(data)
+        os.replace(temp_path, path)
+    except:
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+        raise
@@ -0,0 +1,191 @@
+"""
+Квантование классификатора дефектов в INT8 (TFLite, post-training quantization)
+и оценка точности квантованной модели относительно исходной по каждому классу.
+Квантованная модель сохраняется рядом с исходной (mobile_net_model_int8.tflite)
+и используется при настройке classifier_backend = 'tflite_int8'; модель, сохраненная
+в другое место (--output), используется, если указать ее путь в настройке classifier_int8_path.
+
+Запуск из командной строки:
+    python -m backend.ClassifierQuantization models/mobile_net_model.h5 <папка калибровки> --eval <папка проверки>
+Папка проверки должна быть отдельной: на изображениях калибровки точность квантованной модели завышена.
+"""
+import argparse
+import os
+
+import cv2
+import numpy as np
+
+from backend.ClassifierBackends import KerasClassifier, TFLiteClassifier, int8_model_path, write_atomic
+from backend.ImageIO import imread_unicode
+
+# классы классификатора (в порядке выходов модели)
+CLASS_NAMES = ['blur', 'contrast', 'glares', 'good', 'noise']
+
+def quantize_int8(model_path, calibration_path, output_path=None, max_images=300):
+    """
+    Полное целочисленное квантование: веса и активации в INT8, вход и выход - uint8.
+    Диапазоны активаций подбираются по изображениям из calibration_path (не больше max_images,
+    вложенные папки тоже просматриваются). Возвращает путь к квантованной модели.
+    """
+    import tensorflow as tf
+    output_path = output_path or int8_model_path(model_path)
+
+    # изображения берутся равномерно по всему списку (вложенные папки могут быть по классам)
+    images = _list_images(calibration_path)
+    images = images[::max(1, len(images) // max(1, max_images))][:max_images]
+    if not images:
+        raise ValueError(f"В папке калибровки нет изображений: {calibration_path}")
+
+    def representative_dataset():
+        for image_path in images:
+            model_input = _prepare(imread_unicode(image_path))
+            if model_input is not None:
+                yield [model_input[np.newaxis].astype(np.float32) / 255.0]
+
+    keras_model = tf.keras.models.load_model(str(model_path))
+    converter = tf.lite.TFLiteConverter.from_keras_model(keras_model)
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    converter.representative_dataset = representative_dataset
+    converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+    converter.inference_input_type = tf.uint8
+    converter.inference_output_type = tf.uint8
+    write_atomic(output_path, converter.convert())
+    return output_path
+
+def check_evaluation_path(calibration_path, evaluation_path):
+    """
+    Проверка, что изображения для оценки точности не пересекаются с изображениями калибровки
+    (папки не совпадают и не вложены одна в другую).
+    """
+    if not evaluation_path:
+        raise ValueError("Нужна отдельная папка изображений для оценки точности")
+    calibration = os.path.realpath(calibration_path)
+    evaluation = os.path.realpath(evaluation_path)
+    if os.path.commonpath([calibration, evaluation]) in (calibration, evaluation):
+        raise ValueError(f"Папка оценки точности пересекается с папкой калибровки: {evaluation_path}")
+
+def evaluate_int8(model_path, quantized_path, images_path, class_names=CLASS_NAMES, batch_size=32):
+    """
+    Сравнение точности исходной и квантованной моделей по каждому классу.
+    Если в images_path есть вложенные папки с именами классов, они считаются разметкой;
+    иначе эталоном служат предсказания исходной модели (точность исходной тогда равна 1).
+    Возвращает словарь: {'reference', 'samples', 'classes': {класс: {'samples', 'float', 'int8', 'delta'}}, 'overall'}.
+    """
+    paths, labels = _list_labeled_images(images_path, class_names)
+    float_model = KerasClassifier(model_path)
+    quantized_model = TFLiteClassifier(quantized_path)
+
+    float_classes = []
+    int8_classes = []
+    kept_labels = []
+    for start in range(0, len(paths), batch_size):
+        batch = []
+        for image_path, label in zip(paths[start:start + batch_size], labels[start:start + batch_size]):
+            model_input = _prepare(imread_unicode(image_path))
+            if model_input is None: continue
+            batch.append(model_input)
+            kept_labels.append(label)
+        if not batch: continue
+        model_batch = np.stack(batch).astype(np.float32) / 255.0
+        float_classes.extend(np.argmax(float_model.predict_on_batch(model_batch), axis=1))
+        int8_classes.extend(np.argmax(quantized_model.predict_on_batch(model_batch), axis=1))
+
+    float_classes = np.array(float_classes, dtype=int)
+    int8_classes = np.array(int8_classes, dtype=int)
+    reference = 'labels' if labels and labels[0] is not None else 'float_model'
+    truth = np.array(kept_labels, dtype=int) if reference == 'labels' else float_classes
+
+    def accuracy(predicted, mask):
+        return float(np.mean(predicted[mask] == truth[mask])) if mask.any() else None
+
+    classes = {}
+    for index, class_name in enumerate(class_names):
+        mask = truth == index
+        float_accuracy = accuracy(float_classes, mask)
+        int8_accuracy = accuracy(int8_classes, mask)
+        classes[class_name] = {
+            'samples': int(mask.sum()),
+            'float': float_accuracy,
+            'int8': int8_accuracy,
+            'delta': None if float_accuracy is None else int8_accuracy - float_accuracy
+        }
+
+    everything = np.ones(len(truth), dtype=bool)
+    float_accuracy = accuracy(float_classes, everything)
+    int8_accuracy = accuracy(int8_classes, everything)
+    return {
+        'reference': reference,
+        'samples': int(len(truth)),
+        'classes': classes,
+        'overall': {
+            'float': float_accuracy,
+            'int8': int8_accuracy,
+            'delta': None if float_accuracy is None else int8_accuracy - float_accuracy
+        }
+    }
+
+def format_report(report):
+    """
+    Текстовый отчет по результату evaluate_int8.
+    """
+    def percent(value):
+        return '   -  ' if value is None else f"{value * 100:6.2f}"
+
+    lines = [f"Эталон: {report['reference']}, изображений: {report['samples']}",
+             f"{'класс':<10}{'кол-во':>8}{'float, %':>10}{'int8, %':>10}{'разница':>10}"]
+    rows = list(report['classes'].items()) + [('всего', dict(report['overall'], samples=report['samples']))]
+    for class_name, values in rows:
+        lines.append(f"{class_name:<10}{values['samples']:>8}{percent(values['float']):>10}"
+                     f"{percent(values['int8']):>10}{percent(values['delta']):>10}")
+    return '\n'.join(lines)
+
+def _prepare(image):
+    # так же, как вход классификатора в ProcessingClass: RGB, 224x224
+    if image is None:
+        return None
+    return cv2.resize(cv2.cvtColor(image, cv2.COLOR_BGR2RGB), (224, 224))
+
+def _list_images(folder):
+    paths = []
+    for root, _, files in os.walk(folder):
+        for file_name in sorted(files):
+            if file_name.lower().endswith(('.png', '.jpg', '.jpeg', '.bmp')):
+                paths.append(os.path.join(root, file_name))
+    return sorted(paths)
+
+def _list_labeled_images(folder, class_names):
+    # разметка по вложенным папкам с именами классов, иначе - без разметки
+    labeled = [class_name for class_name in class_names if os.path.isdir(os.path.join(folder, class_name))]
+    if not labeled:
+        paths = _list_images(folder)
+        return paths, [None] * len(paths)
+    paths, labels = [], []
+    for class_name in labeled:
+        class_paths = _list_images(os.path.join(folder, class_name))
+        paths.extend(class_paths)
+        labels.extend([class_names.index(class_name)] * len(class_paths))
+    return paths, labels
+
+def main():
+    parser = argparse.ArgumentParser(description='INT8-квантование классификатора дефектов')
+    parser.add_argument('model_path', help='исходная модель .h5')
+    parser.add_argument('calibration_path', help='папка с изображениями для калибровки')
+    parser.add_argument('--eval', dest='eval_path', required=True,
+                        help='папка для оценки точности (не пересекающаяся с папкой калибровки)')
+    parser.add_argument('--output', dest='output_path',
+                        help='куда сохранить модель (по умолчанию - рядом с исходной, где ее найдет '
+                             "classifier_backend = 'tflite_int8'; другой путь нужно указать в настройке classifier_int8_path)")
+    parser.add_argument('--max-images', type=int, default=300, help='сколько изображений использовать для калибровки')
+    args = parser.parse_args()
+    try:
+        check_evaluation_path(args.calibration_path, args.eval_path)
+    except ValueError as e:
+        parser.error(str(e))
+
+    output_path = quantize_int8(args.model_path, args.calibration_path, args.output_path, args.max_images)
+    print(f"Квантованная модель: {output_path}")
+    report = evaluate_int8(args.model_path, output_path, args.eval_path)
+    print(format_report(report))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+import cv2
+
+class ColorImage:
+    """
+    Изображение (BGR) с кэшем его представлений в других цветовых пространствах.
+    Преобразование в пространство и разделение на каналы выполняются при первом обращении
+    и запоминаются, поэтому несколько методов исправления, применяемых к одному изображению,
+    (и маска и восстановление внутри одного метода) не преобразуют его повторно.
+    Кэш сбрасывается при замене изображения (image = ...). Изменять на месте само изображение
+    и полученные из кэша массивы нельзя: методы исправления всегда создают новые.
+    """
+
+    # преобразования в пространство и обратно в BGR
+    CONVERSIONS = {
+        'yuv': (cv2.COLOR_BGR2YUV, cv2.COLOR_YUV2BGR),
+        'hsv': (cv2.COLOR_BGR2HSV, cv2.COLOR_HSV2BGR),
+        'gray': (cv2.COLOR_BGR2GRAY, cv2.COLOR_GRAY2BGR)
+    }
+    # номер канала яркости в каждом пространстве
+    BRIGHTNESS = {
+        'yuv': 0,  # Y-канал
+        'hsv': 2,  # V-канал
+        'gray': 0
+    }
+
+    def __init__(self, image):
+        self.image = image
+
+    @classmethod
+    def wrap(cls, image):
+        """
+        ColorImage для изображения (или само изображение, если это уже ColorImage).
+        """
+        return image if isinstance(image, cls) else cls(image)
+
+    @property
+    def image(self):
+        return self.__image
+
+    @image.setter
+    def image(self, image):
+        self.__image = image
+        self.__converted = {}
+        self.__channels = {}
+
+    def convert(self, color_space):
+        """
+        Изображение в пространстве color_space ('yuv', 'hsv', 'gray').
+        """
+        converted = self.__converted.get(color_space)
+        if converted is None:
+            converted = self.__converted[color_space] = cv2.cvtColor(self.__image, self.CONVERSIONS[color_space][0])
+        return converted
+
+    def channels(self, color_space):
+        """
+        Кортеж каналов изображения в пространстве color_space.
+        """
+        channels = self.__channels.get(color_space)
+        if channels is None:
+            converted = self.convert(color_space)
+            channels = tuple(cv2.split(converted)) if converted.ndim == 3 else (converted,)
+            self.__channels[color_space] = channels
+        return channels
+
+    def brightness(self, color_space):
+        """
+        Канал яркости в пространстве color_space.
+        """
+        return self.channels(color_space)[self.BRIGHTNESS[color_space]]
+
+    def replace_brightness(self, color_space, channel):
+        """
+        Новое изображение BGR, у которого в пространстве color_space канал яркости заменен на channel.
+        """
+        channels = list(self.channels(color_space))
+        channels[self.BRIGHTNESS[color_space]] = channel
+        merged = cv2.merge(channels) if len(channels) > 1 else channels[0]
+        return cv2.cvtColor(merged, self.CONVERSIONS[color_space][1])
@@ -0,0 +1,95 @@
+import math
+
+import numpy as np
+
+class DefectEstimator:
+    """
+    Оценка самого частого дефекта по выборке изображений (кадров).
+    Накапливает счетчики классов и позволяет остановиться досрочно, когда лидирующий дефект
+    статистически значимо опережает второй: (a - b) / sqrt(a + b) >= z
+    (нормальное приближение критерия знаков для двух самых частых дефектов).
+    Если дефектов в выборке нет, остановиться можно, только когда по правилу трех
+    (верхняя граница доли дефектов 3 / n) доля дефектов заведомо меньше min_defect_rate;
+    при min_defect_rate = 0 выборка в этом случае идет до конца.
+    """
+
+    def __init__(self, z=2.58, min_samples=30, min_defect_rate=0.01):
+        self.z = z
+        self.min_samples = min_samples
+        self.min_defect_rate = min_defect_rate
+        self.counts = {
+            'blur': 0,
+            'contrast': 0,
+            'glares': 0,
+            'good': 0,
+            'noise': 0
+        }
+        self.sampled = 0
+
+    def add(self, predicted_class):
+        self.counts[predicted_class] += 1
+        self.sampled += 1
+
+    def __ranked_defects(self):
+        # при равенстве счетчиков сохраняется порядок словаря (как у max по словарю)
+        defects = [(count, name) for name, count in self.counts.items() if name != 'good']
+        return sorted(defects, key=lambda defect: defect[0], reverse=True)
+
+    def often_defect(self):
+        """
+        Самый частый дефект в выборке (None, если дефектов не встретилось).
+        """
+        count, name = self.__ranked_defects()[0]
+        return name if count > 0 else None
+
+    def margin(self):
+        """
+        Отрыв лидера от второго дефекта в стандартных отклонениях.
+        """
+        (a, _), (b, _) = self.__ranked_defects()[:2]
+        if a + b == 0:
+            return 0.0
+        return (a - b) / math.sqrt(a + b)
+
+    def is_confident(self):
+        """
+        Можно ли остановить выборку: набрано не меньше min_samples и лидер определен надежно
+        (или дефектов не встретилось, и их доля по правилу трех меньше min_defect_rate).
+        """
+        if self.sampled < self.min_samples:
+            return False
+        if self.often_defect() is None:
+            return self.min_defect_rate > 0 and 3 / self.sampled <= self.min_defect_rate
+        return self.margin() >= self.z
+
+    def result(self, total):
+        """
+        Итог оценки: выбранный дефект, счетчики выборки, размер выборки и всего элементов.
+        """
+        return {
+            'often_defect': self.often_defect(),
+            'counts': dict(self.counts),
+            'sampled': self.sampled,
+            'total': total,
+            'margin': self.margin(),
+            'confident': self.is_confident()
+        }
+
+    @staticmethod
+    def sample_indices(total, sampling, stride=1, sample_size=None, seed=None):
+        """
+        Индексы элементов для выборки:
+        'full' - все подряд, 'stride' - каждый stride-й, 'random' - sample_size случайных
+        (по возрастанию, чтобы чтение шло вперед), 'adaptive' - случайная перестановка всех индексов.
+        """
+        if sampling == 'full':
+            return np.arange(total)
+        if sampling == 'stride':
+            return np.arange(0, total, max(1, int(stride)))
+        rng = np.random.default_rng(seed)
+        if sampling == 'random':
+            size = min(total, int(sample_size))
+            return np.sort(rng.choice(total, size=size, replace=False))
+        if sampling == 'adaptive':
+            return rng.permutation(total)
+        raise ValueError(f"Неизвестный режим выборки: {sampling}")
@@ -0,0 +1,48 @@
+"""
+Загрузка моделей распознавания объектов (YOLO) в оптимизированных для CPU форматах.
+Веса .pt один раз экспортируются средствами ultralytics (ONNX или OpenVINO) и сохраняются
+рядом с исходными; экспортированная модель загружается тем же классом YOLO, поэтому
+вызов модели и формат результатов не меняются. При любой ошибке экспорта или загрузки
+используется исходный .pt.
+"""
+import os
+
+# доступные форматы: 'pt' - исходная модель PyTorch
+FORMATS = ('pt', 'onnx', 'openvino')
+
+def exported_path(weights_path, format):
+    """
+    Путь, по которому ultralytics сохраняет экспортированную модель (рядом с весами).
+    """
+    base = os.path.splitext(str(weights_path))[0]
+    if format == 'onnx':
+        return base + '.onnx'
+    if format == 'openvino':
+        return base + '_openvino_model'
+    return str(weights_path)
+
+def export_yolo(weights_path, format, imgsz=640):
+    """
+    Экспорт весов в format (если экспортированная модель есть и новее весов - используется она).
+    Пакет переменного размера, чтобы модель принимала пакеты кадров.
+    """
+    output_path = exported_path(weights_path, format)
+    if format == 'pt':
+        return output_path
+    if os.path.exists(output_path) and os.path.getmtime(output_path) >= os.path.getmtime(str(weights_path)):
+        return output_path
+
+    from ultralytics import YOLO
+    return str(YOLO(str(weights_path)).export(format=format, imgsz=imgsz, dynamic=True))
+
+def load_yolo(weights_path, format='pt', imgsz=640):
+    """
+    Модель YOLO в формате format с откатом на исходный .pt.
+    """
+    from ultralytics import YOLO
+    if format != 'pt':
+        try:
+            return YOLO(export_yolo(weights_path, format, imgsz), task='detect')
+        except Exception as e:
+            print('load_yolo', format, e)
+    return YOLO(str(weights_path))
@@ -0,0 +1,71 @@
+import shutil
+import tempfile
+
+import numpy as np
+
+class FrameSpillCache:
+    """
+    Временное хранилище уже декодированных кадров (изображений) на диске.
+    Кадры записываются подряд без сжатия, поэтому обратное чтение не требует декодирования.
+    Объем ограничен limit_mb и долей max_disk_fraction свободного места на диске временной папки:
+    как только очередной кадр не помещается, хранилище перестает принимать кадры
+    (сохраняется непрерывное начало последовательности).
+    """
+
+    def __init__(self, limit_mb, directory=None, max_disk_fraction=0.5):
+        self.__limit = int(limit_mb * 1024 * 1024)
+        if self.__limit > 0:
+            free = shutil.disk_usage(directory or tempfile.gettempdir()).free
+            self.__limit = min(self.__limit, int(free * max_disk_fraction))
+        self.__file = tempfile.TemporaryFile(dir=directory) if self.__limit > 0 else None
+        self.__index = []  # (форма, тип) каждого кадра
+        self.__size = 0
+        self.full = self.__file is None
+
+    def __len__(self):
+        return len(self.__index)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def append(self, frame):
+        """
+        Сохраняет кадр. Возвращает False, если кадр не поместился в ограничение.
+        """
+        if self.full:
+            return False
+        frame = np.ascontiguousarray(frame)
+        if self.__size + frame.nbytes > self.__limit:
+            self.full = True
+            print('FrameSpillCache', f"хранилище заполнено ({len(self)} кадров), остальные будут прочитаны из источника заново")
+            return False
+        if not self.__index:
+            print('FrameSpillCache', f"кадры сохраняются во временный файл (не больше {self.__limit // (1024 * 1024)} МБ)")
+        self.__file.write(memoryview(frame).cast('B'))
+        self.__index.append((frame.shape, frame.dtype))
+        self.__size += frame.nbytes
+        return True
+
+    def __iter__(self):
+        """
+        Последовательное чтение сохраненных кадров (каждый кадр - отдельный изменяемый массив).
+        """
+        if self.__file is None:
+            return
+        self.__file.flush()
+        self.__file.seek(0)
+        for shape, dtype in self.__index:
+            frame = np.empty(shape, dtype=dtype)
+            self.__file.readinto(memoryview(frame).cast('B'))
+            yield frame
+
+    def close(self):
+        if self.__file is not None:
+            self.__file.close()
+            self.__file = None
+        self.__index = []
+        self.__size = 0
+        self.full = True
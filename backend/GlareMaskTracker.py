@@ -0,0 +1,92 @@
+import cv2
+import numpy as np
+
+from backend.ImageMetrics import thumbnail as frame_thumbnail
+
+class GlareMaskTracker:
+    """
+    Переиспользование маски бликов между соседними кадрами видео.
+    При неподвижной камере и постоянном освещении блики почти не смещаются, поэтому маска
+    пересчитывается только тогда, когда кадр заметно отличается от кадра, по которому
+    она была построена (опорного), или маска используется дольше max_age кадров.
+    Отличие кадров - максимум модуля разности их уменьшенных копий (каждый пиксель копии -
+    среднее по блоку кадра): усреднение подавляет шум, а максимум замечает сдвиг одного блика.
+    При reuse_patches и отличии не больше patch_threshold пиксели под маской берутся
+    из предыдущего результата восстановления, и само восстановление не выполняется.
+    Возраст маски считается в кадрах видео, а не в обращениях к ней: после каждого кадра
+    вызывается next_frame() (и для кадров, на которых блики не исправлялись).
+    Состояние одно на последовательность кадров: кадры должны обрабатываться по порядку в одном потоке.
+    """
+
+    def __init__(self, threshold=8.0, max_age=30, reuse_patches=False, patch_threshold=2.0):
+        self.threshold = threshold
+        self.max_age = max_age
+        self.reuse_patches = reuse_patches
+        self.patch_threshold = patch_threshold
+        self.reset()
+
+    def reset(self):
+        # состояние по каждому набору параметров построения маски: {ключ: {...}}
+        self.__states = {}
+        # номер текущего кадра
+        self.__frame = 0
+        self.stats = {
+            'frames': 0,
+            'lookups': 0,
+            'computed': 0,
+            'reused': 0,
+            'patched': 0
+        }
+
+    def lookup(self, image, key):
+        """
+        Маска для кадра image, построенная по тем же параметрам key, или None, если ее нужно пересчитать.
+        Вторым значением возвращается прежний результат восстановления, если его пиксели
+        под маской можно перенести в этот кадр (иначе None).
+        """
+        self.stats['lookups'] += 1
+        thumbnail = frame_thumbnail(image)
+        state = self.__states.get(key)
+        valid = state is not None and state['mask'] is not None and state['shape'] == image.shape
+        difference = self.__difference(thumbnail, state['thumbnail']) if valid else None
+        if not valid or self.__frame - state['frame'] >= self.max_age or difference > self.threshold:
+            self.__states[key] = {'shape': image.shape, 'thumbnail': thumbnail, 'mask': None, 'frame': self.__frame, 'result': None}
+            return None, None
+
+        self.stats['reused'] += 1
+        result = None
+        if self.reuse_patches and state['result'] is not None and difference <= self.patch_threshold:
+            result = state['result']
+            self.stats['patched'] += 1
+        return state['mask'], result
+
+    def next_frame(self):
+        """
+        Переход к следующему кадру (вызывается после обработки каждого кадра).
+        """
+        self.__frame += 1
+        self.stats['frames'] += 1
+
+    def store(self, key, mask=None, result=None):
+        """
+        Запоминание маски, построенной для текущего опорного кадра, и результата восстановления.
+        """
+        state = self.__states.get(key)
+        if state is None:
+            return
+        if mask is not None:
+            state['mask'] = mask
+            self.stats['computed'] += 1
+        if result is not None and self.reuse_patches:
+            state['result'] = result
+
+    @staticmethod
+    def paste(image, mask, result):
+        """
+        Кадр image, в котором пиксели под маской взяты из прежнего результата восстановления.
+        """
+        return cv2.copyTo(result, mask, image.copy())
+
+    @staticmethod
+    def __difference(thumbnail, reference):
+        return float(np.abs(thumbnail - reference).max())
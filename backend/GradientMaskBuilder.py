@@ -0,0 +1,83 @@
+import threading
+
+import cv2
+import numpy as np
+
+class GradientMaskBuilder:
+    """
+    Маска по градиенту для исправления бликов (общая для simple_inpaint и adaptive_inpaint).
+    Градиент считается в float32 (модуль - cv2.magnitude) или, при magnitude='l1', в int16
+    как |gx| + |gy|; затем нормализуется к 0..255 и сравнивается с порогом.
+    Промежуточные массивы выделяются один раз на размер кадра и переиспользуются
+    (у каждого потока свои), новой памяти на кадр выделяется только под саму маску.
+    """
+
+    def __init__(self, magnitude='l2'):
+        self.magnitude = magnitude
+        self.__buffers = threading.local()
+
+    def build(self, channel, gradient_method, gradient_threshold):
+        """
+        Маска (uint8, 0 или 255) пикселей, у которых нормализованный градиент канала channel
+        больше gradient_threshold. gradient_method: 'sobel', 'scharr' или 'laplacian'.
+        """
+        buffers = self.__get_buffers(channel.shape)
+
+        if gradient_method == 'laplacian':
+            gradient = cv2.Laplacian(channel, cv2.CV_32F, dst=buffers['gx'])
+        elif self.magnitude == 'l1':
+            # приближение |gx| + |gy| в int16 (значения Собеля и Щарра для uint8 помещаются в int16)
+            gx, gy = buffers['gx16'], buffers['gy16']
+            self.__derivatives(channel, gradient_method, cv2.CV_16S, gx, gy)
+            np.abs(gx, out=gx)
+            np.abs(gy, out=gy)
+            gradient = cv2.add(gx, gy, dst=gx)
+        else:
+            gx, gy = buffers['gx'], buffers['gy']
+            self.__derivatives(channel, gradient_method, cv2.CV_32F, gx, gy)
+            gradient = cv2.magnitude(gx, gy, gx)
+
+        # нормализация градиента и создание маски
+        normalized = cv2.normalize(gradient, buffers['normalized'], 0, 255, cv2.NORM_MINMAX, cv2.CV_8U)
+        _, gradient_mask = cv2.threshold(normalized, gradient_threshold, 255, cv2.THRESH_BINARY)
+        return gradient_mask
+
+    @staticmethod
+    def __derivatives(channel, gradient_method, depth, gx, gy):
+        if gradient_method == 'sobel':
+            cv2.Sobel(channel, depth, 1, 0, dst=gx, ksize=3)
+            cv2.Sobel(channel, depth, 0, 1, dst=gy, ksize=3)
+        elif gradient_method == 'scharr':
+            cv2.Scharr(channel, depth, 1, 0, dst=gx)
+            cv2.Scharr(channel, depth, 0, 1, dst=gy)
+        else:
+            raise ValueError(f"Неизвестный способ вычисления градиента: {gradient_method}")
+
+    def __get_buffers(self, shape):
+        """
+        Буферы текущего потока для кадра размера shape (сбрасываются при смене размера).
+        Каждый буфер создается при первом обращении, поэтому в режиме 'l2' буферы int16 не выделяются.
+        """
+        buffers = getattr(self.__buffers, 'arrays', None)
+        if buffers is None or buffers.shape != shape[:2]:
+            buffers = self.__buffers.arrays = _Buffers(shape[:2])
+        return buffers
+
+
+class _Buffers(dict):
+    # типы буферов по именам
+    DTYPES = {
+        'gx': np.float32,
+        'gy': np.float32,
+        'gx16': np.int16,
+        'gy16': np.int16,
+        'normalized': np.uint8
+    }
+
+    def __init__(self, shape):
+        super().__init__()
+        self.shape = shape
+
+    def __missing__(self, name):
+        buffer = self[name] = np.empty(self.shape, dtype=self.DTYPES[name])
+        return buffer
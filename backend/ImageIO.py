@@ -0,0 +1,138 @@
+import mmap
+import os
+import tempfile
+import threading
+
+import cv2
+import numpy as np
+
+class ImageReader:
+    """
+    Чтение изображений с поддержкой Unicode-путей без временных файлов:
+    байты файла читаются в переиспользуемый буфер и декодируются из памяти (cv2.imdecode).
+    Большие файлы (от mmap_threshold_mb) не копируются, а отображаются в память.
+    Экземпляр не потокобезопасен (буфер общий), для потоков есть функция imread_unicode.
+    """
+
+    def __init__(self, mmap_threshold_mb=64):
+        self.mmap_threshold = int(mmap_threshold_mb * 1024 * 1024)
+        self.__buffer = bytearray()
+
+    def read(self, path, flags=cv2.IMREAD_COLOR):
+        """
+        Аналог cv2.imread(): возвращает изображение или None, если файл не удалось прочитать.
+        """
+        try:
+            size = os.path.getsize(path)
+            if size == 0:
+                return None
+            if size >= self.mmap_threshold:
+                return self.__read_mmap(path, flags)
+
+            # буфер растет только при необходимости и переиспользуется между вызовами
+            if len(self.__buffer) < size:
+                self.__buffer = bytearray(max(size, 2 * len(self.__buffer)))
+            with open(path, 'rb', buffering=0) as file:
+                read_size = file.readinto(memoryview(self.__buffer)[:size])
+            data = np.frombuffer(self.__buffer, dtype=np.uint8, count=read_size)
+            img = cv2.imdecode(data, flags)
+            del data
+            return img
+        except OSError:
+            return None
+
+    def __read_mmap(self, path, flags):
+        with open(path, 'rb') as file:
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                data = np.frombuffer(mapped, dtype=np.uint8)
+                try:
+                    return cv2.imdecode(data, flags)
+                finally:
+                    # ссылка на буфер должна исчезнуть до закрытия mmap (и при ошибке декодирования),
+                    # иначе закрытие завершится BufferError, скрывающей исходную ошибку
+                    del data
+
+
+class ImageWriter:
+    """
+    Запись изображений с поддержкой Unicode-путей без промежуточного файла с ASCII-именем:
+    изображение кодируется в памяти в формат расширения конечного файла (cv2.imencode),
+    записывается один раз во временный файл в той же папке и атомарно переименовывается.
+    jpeg_quality - качество JPEG (0-100), png_compression - уровень сжатия PNG (0-9),
+    webp_quality - качество WebP (1-100).
+    """
+
+    def __init__(self, jpeg_quality=95, png_compression=1, webp_quality=95):
+        self.jpeg_quality = jpeg_quality
+        self.png_compression = png_compression
+        self.webp_quality = webp_quality
+
+    def get_params(self, ext):
+        """
+        Параметры кодирования для расширения.
+        """
+        ext = ext.lower()
+        if ext in ['.jpg', '.jpeg', '.jpe']:
+            return [cv2.IMWRITE_JPEG_QUALITY, int(self.jpeg_quality)]
+        if ext == '.png':
+            return [cv2.IMWRITE_PNG_COMPRESSION, int(self.png_compression)]
+        if ext == '.webp':
+            return [cv2.IMWRITE_WEBP_QUALITY, int(self.webp_quality)]
+        return []
+
+    def encode(self, img, ext):
+        """
+        Кодирование в память. Для неизвестных OpenCV расширений используется JPEG.
+        """
+        try:
+            ok, data = cv2.imencode(ext, img, self.get_params(ext))
+        except cv2.error:
+            ok, data = cv2.imencode('.jpg', img, self.get_params('.jpg'))
+        return data if ok else None
+
+    def write(self, path, img):
+        """
+        Аналог cv2.imwrite(): возвращает True, если файл записан.
+        """
+        path = os.fspath(path)
+        data = self.encode(img, os.path.splitext(path)[1])
+        if data is None:
+            return False
+
+        # временный файл в той же папке - тогда переименование атомарное
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as file:
+                file.write(data)
+            os.replace(temp_path, path)
+        except:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+            raise
+        return True
+
+
+# у каждого потока свой читатель (и свой буфер)
+_thread_state = threading.local()
+
+def get_image_reader():
+    """
+    Читатель изображений текущего потока.
+    """
+    reader = getattr(_thread_state, 'reader', None)
+    if reader is None:
+        reader = _thread_state.reader = ImageReader()
+    return reader
+
+def imread_unicode(path, flags=cv2.IMREAD_COLOR):
+    """
+    Аналог cv2.imread() с поддержкой Unicode-путей.
+    """
+    return get_image_reader().read(path, flags)
+
+def imwrite_unicode(path, img, jpeg_quality=95, png_compression=1):
+    """
+    Аналог cv2.imwrite() с поддержкой Unicode-путей.
+    """
+    return ImageWriter(jpeg_quality=jpeg_quality, png_compression=png_compression).write(path, img)
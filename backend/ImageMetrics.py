@@ -0,0 +1,114 @@
+"""
+Простые метрики качества изображения (для быстрой предварительной проверки перед классификатором).
+Все функции принимают изображение в оттенках серого (uint8), см. to_gray.
+"""
+import math
+
+import cv2
+import numpy as np
+
+# ядро Иммеркера: разность двух лапласианов, подавляет структуру изображения и оставляет шум
+IMMERKAER_KERNEL = np.array([[1, -2, 1], [-2, 4, -2], [1, -2, 1]], dtype=np.float32)
+# отношение медианы модуля к СКО для нормального распределения
+MAD_TO_SIGMA = 0.6744897501960817
+
+def to_gray(image):
+    if image.ndim == 2:
+        return image
+    return cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+
+def laplacian_variance(gray):
+    """
+    Дисперсия лапласиана: мала у размытых изображений.
+    """
+    _, std = cv2.meanStdDev(cv2.Laplacian(gray, cv2.CV_32F))
+    return float(std[0, 0] ** 2)
+
+def histogram_spread(gray, low=0.02, high=0.98):
+    """
+    Ширина гистограммы яркости между квантилями low и high: мала у малоконтрастных изображений.
+    """
+    hist = cv2.calcHist([gray], [0], None, [256], [0, 256]).ravel()
+    cdf = np.cumsum(hist) / max(1.0, hist.sum())
+    return int(np.searchsorted(cdf, high) - np.searchsorted(cdf, low))
+
+def saturated_fraction(gray, level=250):
+    """
+    Доля пересвеченных пикселей (яркость не меньше level): велика при бликах.
+    """
+    return float(cv2.countNonZero(cv2.inRange(gray, level, 255))) / gray.size
+
+def noise_sigma(gray):
+    """
+    Быстрая оценка СКО шума по Иммеркеру: среднее модуля отклика ядра IMMERKAER_KERNEL.
+    """
+    height, width = gray.shape[:2]
+    if height < 3 or width < 3:
+        return 0.0
+    response = cv2.filter2D(gray.astype(np.float32), -1, IMMERKAER_KERNEL)[1:-1, 1:-1]
+    return float(np.abs(response).sum() * math.sqrt(math.pi / 2) / (6 * (width - 2) * (height - 2)))
+
+def fast_noise_sigma(image, max_side=512):
+    """
+    Быстрая оценка СКО шума в единицах яркости (как skimage.restoration.estimate_sigma):
+    медиана модуля отклика ядра IMMERKAER_KERNEL (робастная оценка, MAD) на прореженном изображении.
+    Прореживание - выборка каждого k-го пикселя без усреднения, поэтому уровень шума не меняется.
+    Нулевые отклики (плоские области) не учитываются. Для цветных изображений - среднее по каналам.
+    """
+    height, width = image.shape[:2]
+    step = max(1, -(-max(height, width) // max_side))
+    small = image[::step, ::step]
+    if small.shape[0] < 3 or small.shape[1] < 3:
+        return 0.0
+
+    response = np.abs(cv2.filter2D(small.astype(np.float32), -1, IMMERKAER_KERNEL)[1:-1, 1:-1])
+    response = response.reshape(-1, 1 if response.ndim == 2 else response.shape[2])
+    sigmas = []
+    for channel in response.T:
+        channel = channel[channel > 0]
+        # у ядра сумма квадратов коэффициентов 36: СКО отклика в 6 раз больше СКО шума
+        sigmas.append(np.median(channel) / (MAD_TO_SIGMA * 6) if channel.size else 0.0)
+    return float(np.mean(sigmas))
+
+def thumbnail(image, side=64, subsample=4):
+    """
+    Уменьшенная копия изображения (BGR или оттенки серого) в оттенках серого, int16:
+    большая сторона - side пикселей, каждый пиксель - среднее по блоку изображения.
+    Для сравнения кадров видео: усреднение подавляет шум. В среднее по блоку берется
+    каждый subsample-й пиксель (так в несколько раз быстрее, а среднее почти не меняется).
+    """
+    height, width = image.shape[:2]
+    scale = side / max(height, width)
+    size = (max(1, round(width * scale)), max(1, round(height * scale)))
+    step = max(1, min(subsample, int(1 / scale) // 2))
+    small = cv2.resize(image[::step, ::step], size, interpolation=cv2.INTER_AREA)
+    return to_gray(small).astype(np.int16)
+
+def compare_noise_estimators(images, bounds=(10, 30)):
+    """
+    Сравнение fast_noise_sigma с skimage.restoration.estimate_sigma на изображениях images.
+    bounds - границы уровня шума, по которым адаптивные фильтры выбирают размер ядра.
+    Возвращает среднее и максимальное расхождение оценок, корреляцию и долю изображений,
+    для которых обе оценки приводят к одному и тому же размеру ядра.
+    """
+    from skimage.restoration import estimate_sigma
+
+    reference = []
+    fast = []
+    for image in images:
+        channel_axis = -1 if image.ndim == 3 else None
+        reference.append(float(estimate_sigma(image, average_sigmas=True, channel_axis=channel_axis)))
+        fast.append(fast_noise_sigma(image))
+    reference = np.array(reference)
+    fast = np.array(fast)
+    if not len(reference):
+        return None
+
+    same_kernel = np.digitize(reference, bounds) == np.digitize(fast, bounds)
+    return {
+        'samples': len(reference),
+        'mean_abs_diff': float(np.abs(reference - fast).mean()),
+        'max_abs_diff': float(np.abs(reference - fast).max()),
+        'correlation': float(np.corrcoef(reference, fast)[0, 1]) if len(reference) > 1 else None,
+        'same_kernel': float(same_kernel.mean())
+    }
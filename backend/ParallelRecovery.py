@@ -0,0 +1,86 @@
+"""
+Функции, выполняемые в рабочих процессах при параллельной обработке.
+Каждый рабочий процесс один раз создает свой ProcessingClass (и загружает модели),
+а затем обрабатывает переданные ему части (шарды) данных.
+"""
+
+# обработчик текущего рабочего процесса
+_processor = None
+
+def init_worker(model_path, yolo_raw_path, yolo_best_path, output_path):
+    """
+    Инициализация рабочего процесса: создание обработчика с моделями.
+    """
+    global _processor
+    from backend.ProcessingClass import ProcessingClass
+    _processor = ProcessingClass(
+        model_path=model_path,
+        yolo_raw_path=yolo_raw_path,
+        yolo_best_path=yolo_best_path,
+        output_path=output_path
+    )
+
+def _configure(task):
+    _processor.set_input_path(task['input_path'])
+    # внутри рабочего процесса обработка без вложенных процессов
+    _processor.set_performance_settings(**dict(
+        task['performance_settings'], dataset_workers=1, video_segment_workers=1))
+    if 'methods_state' in task:
+        _processor.set_methods_state(task['methods_state'])
+
+def classify_dataset_shard(task):
+    """
+    Классификация части датасета: возвращает список классов изображений task['image_names'].
+    """
+    _configure(task)
+    return _processor.classify_dataset_shard(task['image_names'])
+
+def recover_dataset_shard(task):
+    """
+    Исправление части датасета: возвращает словарь результатов по этой части (или None при ошибке).
+    """
+    _configure(task)
+    return _processor.recovery_dataset_shard(
+        task['image_names'],
+        task['processed_path'],
+        task['processing_mode'],
+        task['defect_mode'],
+        task['often_class'],
+        task['stored_classes']
+    )
+
+def classify_video_segment(task):
+    """
+    Классификация кадров сегмента видео [task['start'], task['end']).
+    """
+    _configure(task)
+    return _processor.classify_video_segment(task['start'], task['end'])
+
+def recover_video_segment(task):
+    """
+    Исправление сегмента видео с записью в task['segment_path'].
+    """
+    _configure(task)
+    return _processor.recovery_video_segment(
+        task['start'],
+        task['end'],
+        task['segment_path'],
+        task['processing_mode'],
+        task['defect_mode'],
+        task['often_class'],
+        task['stored_classes']
+    )
+
+def detect_video_segment(task):
+    """
+    Разметка объектов на сегменте видео task['source_path'] с записью в task['segment_path'].
+    """
+    _configure(task)
+    return _processor.detect_video_segment(
+        task['source_path'],
+        task['start'],
+        task['end'],
+        task['segment_path'],
+        task['detect_type'],
+        task['confidence_threshold']
+    )
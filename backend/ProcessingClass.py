@@ -1,15 +1,39 @@
 import cv2
 import os
-import tensorflow as tf  
-from ultralytics import YOLO
 import numpy as np
-import pywt
-from skimage.restoration import (denoise_wavelet, estimate_sigma)
 from pathlib import Path
 import tempfile
 import shutil
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import multiprocessing
+import threading
+import time
+from backend.ClassificationCache import ClassificationCache
+from backend.ClassifierBackends import create_classifier, compare_predictions
+from backend.DetectorBackends import load_yolo, export_yolo
+from backend.ClassifierQuantization import quantize_int8, evaluate_int8, format_report, check_evaluation_path
+from backend.QualityPrefilter import QualityPrefilter
+from backend.ImageMetrics import fast_noise_sigma, compare_noise_estimators
+from backend.GradientMaskBuilder import GradientMaskBuilder
+from backend.RegionInpaint import inpaint_regions
+from backend.GlareMaskTracker import GlareMaskTracker
+from backend.ColorImage import ColorImage
+from backend.TemporalEqualizer import TemporalEqualizer
+from backend.FrameSpillCache import FrameSpillCache
+from backend.DefectEstimator import DefectEstimator
+from backend.ImageIO import imread_unicode, ImageWriter
+from backend import ParallelRecovery
+from backend.VideoPipeline import VideoPipeline
+from backend.VideoSegments import split_segments, open_video_at, concat_videos, can_concat
 
 class ProcessingClass:
+    # расширения видеофайлов (как в диалоге выбора файла)
+    VIDEO_EXTENSIONS = ('.mp4', '.avi', '.mov')
+    # модели обработчика (классификатор и две модели распознавания объектов)
+    MODEL_NAMES = ('model', 'yolo_raw_model', 'yolo_best_model')
+    # методы исправления, принимающие ColorImage (с кэшем цветовых пространств)
+    COLOR_IMAGE_METHODS = ('hist_equalization', 'clahe_algorithm', 'simple_inpaint', 'adaptive_inpaint')
+
     # def __init__(self, input_path, model_path, yolo_raw_path, yolo_best_path, output_path):
     def __init__(self, model_path, yolo_raw_path, yolo_best_path, output_path):
         # self.input_path = input_path
@@ -19,9 +43,128 @@ class ProcessingClass:
         self.output_path = output_path
         # self.processing_mode = processing_mode
 
-        self.model = tf.keras.models.load_model(self.model_path)
-        self.yolo_raw_model = YOLO(self.yolo_raw_path)
-        self.yolo_best_model = YOLO(self.yolo_best_path)
+        # модели загружаются при первом обращении (или заранее в фоне, см. load_models_async)
+        self.__models = {}
+        self.__models_locks = {name: threading.Lock() for name in self.MODEL_NAMES}
+
+        # готовность моделей после прогрева: 'not_started', 'warming_up', 'ready' или 'error'
+        self.__readiness = 'not_started'
+        self.__warmup_finished = threading.Event()
+        self.__warmup_timings = {}
+        # окончание прогрева каждой модели (чтобы ждать только нужные модели)
+        # и модели, которые прогреваются сейчас
+        self.__model_warmed = {name: threading.Event() for name in self.MODEL_NAMES}
+        self.__warming_names = set()
+
+        # классы, которые различает классификатор (в порядке выходов модели)
+        self.class_names = ['blur', 'contrast', 'glares', 'good', 'noise']
+
+        # настройки производительности
+        self.__performance_settings = {
+            # среда выполнения классификатора: 'keras', 'tflite', 'tflite_int8' или 'onnx' (см. ClassifierBackends)
+            'classifier_backend': 'keras',
+            # путь к INT8-модели для 'tflite_int8' (None - рядом с исходной, см. int8_model_path)
+            'classifier_int8_path': None,
+            # число потоков среды выполнения классификатора (None - по умолчанию)
+            'classifier_threads': None,
+            # сколько изображений подается в модель классификации за один вызов
+            'classification_batch_size': 32,
+            # модуль градиента в масках бликов: 'l2' (точный, float32) или 'l1' (|gx| + |gy|, int16)
+            'gradient_magnitude': 'l2',
+            # восстановление бликов только вокруг областей маски
+            'inpaint_roi': True,
+            # доля площади кадра под областями, начиная с которой восстанавливается весь кадр
+            'inpaint_roi_max_coverage': 0.3,
+            # переиспользование масок бликов между кадрами видео (только при одном потоке обработки кадров)
+            'glare_mask_reuse': False,
+            # отличие кадра от опорного (в уровнях яркости), начиная с которого маска пересчитывается
+            'glare_reuse_threshold': 8.0,
+            # через сколько кадров маска пересчитывается в любом случае
+            'glare_reuse_max_age': 30,
+            # перенос восстановленных пикселей с предыдущих кадров при отличии не больше glare_patch_threshold
+            'glare_patch_reuse': False,
+            'glare_patch_threshold': 2.0,
+            # общая для соседних кадров видео таблица гистограммного выравнивания (только при одном потоке)
+            'video_contrast_smoothing': False,
+            # через сколько кадров таблица пересчитывается и доля новой таблицы при сглаживании
+            'contrast_lut_interval': 10,
+            'contrast_lut_alpha': 0.3,
+            # отличие кадра (в уровнях яркости), считающееся сменой сцены: таблица пересчитывается сразу
+            'contrast_scene_threshold': 20.0,
+            # быстрая проверка качества перед классификатором: None (выключена), 'shadow' или 'skip'
+            'quality_prefilter': None,
+            # пороги проверки качества (подбираются calibrate_prefilter)
+            'prefilter_thresholds': None,
+            # ограничение памяти кэша классификации в мегабайтах (0 - кэш отключен)
+            'classification_cache_mb': 64,
+            # режим 'often_defect' за один проход декодирования и классификации
+            # (декодированные кадры временно пишутся на диск, поэтому по умолчанию выключен)
+            'often_defect_single_pass': False,
+            # ограничение временного хранилища декодированных кадров в мегабайтах
+            # (не больше половины свободного места на диске временной папки)
+            'frame_spill_limit_mb': 1024,
+            # оценка самого частого дефекта по выборке: None (все кадры), 'stride', 'random', 'adaptive'
+            'often_defect_sampling': None,
+            # шаг выборки для 'stride'
+            'sampling_stride': 30,
+            # размер случайной выборки для 'random'
+            'sampling_size': 300,
+            # порог отрыва лидера (в стандартных отклонениях) и минимальная выборка для 'adaptive'
+            'sampling_confidence_z': 2.58,
+            'sampling_min_samples': 30,
+            # доля дефектов, которой можно пренебречь: при 'adaptive' без найденных дефектов выборка
+            # останавливается, когда по правилу трех доля дефектов заведомо меньше (0 - выборка до конца)
+            'sampling_min_defect_rate': 0.01,
+            # зерно генератора случайных чисел (None - случайное)
+            'sampling_seed': None,
+            # качество JPEG (0-100) и уровень сжатия PNG (0-9) при сохранении результатов
+            'jpeg_quality': 95,
+            'png_compression': 1,
+            # число процессов для обработки датасета (1 - последовательная обработка)
+            'dataset_workers': 1,
+            # конвейер для видео: чтение, обработка и запись в отдельных потоках
+            'video_pipeline': True,
+            # число потоков стадии обработки и размер очередей между стадиями (в пакетах кадров)
+            'video_pipeline_workers': 1,
+            'video_pipeline_queue_size': 2,
+            # число процессов для обработки видео по сегментам (1 - без деления на сегменты)
+            'video_segment_workers': 1,
+            # минимальная длина сегмента в кадрах
+            'video_min_segment_frames': 300,
+            # сколько изображений подается в модель распознавания объектов за один вызов
+            'detection_batch_size': 8,
+            # формат моделей распознавания объектов: 'pt', 'onnx' или 'openvino' (см. DetectorBackends)
+            'detection_backend': 'pt',
+        }
+
+        # пул процессов для параллельной обработки (создается при первой необходимости)
+        self.__process_pool = None
+        self.__process_pool_workers = 0
+
+        # построение масок бликов по градиенту (с переиспользуемыми буферами)
+        self.__gradient_mask_builder = GradientMaskBuilder(self.__performance_settings['gradient_magnitude'])
+
+        # состояние обработки последовательности кадров видео (у каждого потока свое):
+        # переиспользование масок бликов и таблица гистограммного выравнивания
+        self.__video_state = threading.local()
+
+        # объекты CLAHE по параметрам (у каждого потока свои)
+        self.__clahe = threading.local()
+
+        # быстрая проверка качества перед классификатором
+        self.__prefilter = QualityPrefilter(self.__performance_settings['prefilter_thresholds'])
+
+        # буферы входа классификатора (у каждого потока свои)
+        self.__batch_buffers = threading.local()
+
+        # кэш результатов классификации (общий для всех проходов по одним и тем же данным)
+        self.__classification_cache = ClassificationCache(
+            max_memory_mb=self.__performance_settings['classification_cache_mb'])
+
+        # запись изображений с параметрами кодирования из настроек
+        self.__image_writer = ImageWriter(
+            jpeg_quality=self.__performance_settings['jpeg_quality'],
+            png_compression=self.__performance_settings['png_compression'])
 
         self.__auto_methods = {
             'blur': {
@@ -454,10 +597,10 @@ class ProcessingClass:
             'flags': ['inpaint_ns', 'inpaint_telea'],
             'gradient_method': ['sobel', 'scharr', 'laplacian'],
             'adaptive_method': ['gaussian_av', 'mean'],
-            'estimate_noise': ['function', 'gaussian'], 
+            'estimate_noise': ['function', 'gaussian', 'fast'], 
             'wavelet_type': ['haar', 'db2', 'db4', 'sym2', 'bior1.3'],
             'wavelet_mode': ['hard', 'soft'],
-            'wavelet_estimate_noise': ['function', 'gaussian', 'wavelet'],
+            'wavelet_estimate_noise': ['function', 'gaussian', 'wavelet', 'fast'],
         }
 
         # перевод параметров на русский
@@ -478,6 +621,7 @@ class ProcessingClass:
             'function': 'с помощью медианного отклонения',
             'gaussian': 'с помощью гауссова ядра',
             'wavelet': 'с помощью вейвлет-разложения',
+            'fast': 'быстрая оценка по высокочастотному остатку',
             'haar': 'Хаара',
             'db2': 'Добеши-2',
             'db4': 'Добеши-4',
@@ -521,8 +665,176 @@ class ProcessingClass:
         """
         Явное освобождение ресурсов.
         """
-        if hasattr(self, 'model'):
-            del self.model
+        self.__models.clear()
+        if self.__process_pool is not None:
+            self.__process_pool.shutdown()
+            self.__process_pool = None
+
+    @property
+    def model(self):
+        return self.__get_model('model')
+
+    @property
+    def yolo_raw_model(self):
+        return self.__get_model('yolo_raw_model')
+
+    @property
+    def yolo_best_model(self):
+        return self.__get_model('yolo_best_model')
+
+    def __get_model(self, name):
+        """
+        Модель по имени; при первом обращении загружается (один раз, даже из нескольких потоков).
+        """
+        model = self.__models.get(name)
+        if model is None:
+            with self.__models_locks[name]:
+                model = self.__models.get(name)
+                if model is None:
+                    model = self.__models[name] = self.__load_model(name)
+        return model
+
+    def __load_model(self, name):
+        # тяжелые библиотеки импортируются только при загрузке моделей
+        if name == 'model':
+            return create_classifier(
+                self.__performance_settings['classifier_backend'],
+                self.model_path,
+                num_threads=self.__performance_settings['classifier_threads'],
+                int8_path=self.__performance_settings['classifier_int8_path']
+            )
+        weights_path = self.yolo_raw_path if name == 'yolo_raw_model' else self.yolo_best_path
+        return load_yolo(weights_path, self.__performance_settings['detection_backend'])
+
+    def is_model_loaded(self, name):
+        return name in self.__models
+
+    def load_models(self, names=None):
+        """
+        Загрузка моделей names (по умолчанию - всех), уже загруженные пропускаются.
+        """
+        for name in names or self.MODEL_NAMES:
+            self.__get_model(name)
+
+    def load_models_async(self, names=None):
+        """
+        Загрузка моделей в фоновом потоке, пока интерфейс уже работает.
+        Ошибка загрузки здесь не пробрасывается: модель повторно загрузится
+        при первом обращении, и ошибка возникнет уже там.
+        Возвращает запущенный поток.
+        """
+        def load():
+            try:
+                self.load_models(names)
+            except Exception as e:
+                print('load_models_async', e)
+
+        thread = threading.Thread(target=load, daemon=True)
+        thread.start()
+        return thread
+
+    def warmup(self, names=None, frame_size=None):
+        """
+        Прогрев моделей names (по умолчанию - всех): загрузка и первый вызов на пустых данных
+        рабочей формы (пакет classification_batch_size изображений 224x224 для классификатора,
+        пакет detection_batch_size кадров размера frame_size = (ширина, высота) для YOLO),
+        чтобы построение графа и выделение памяти не приходились на первое обрабатываемое изображение.
+        YOLO приводит вход к форме, зависящей от соотношения сторон кадра (например, 384x640
+        для 16:9), поэтому прогрев помогает только для кадров с тем же соотношением сторон, что
+        у frame_size; без frame_size прогрев идет на кадрах 640x640, и для неквадратных
+        изображений первый настоящий вызов YOLO все равно будет медленнее.
+        Возвращает время в секундах по каждой модели: {имя: {'load': ..., 'warmup': ...}}.
+        """
+        names = names or self.MODEL_NAMES
+        width, height = frame_size or (640, 640)
+        self.__start_warmup(names)
+        try:
+            for name in names:
+                start = time.perf_counter()
+                model = self.__get_model(name)
+                loaded = time.perf_counter()
+
+                if name == 'model':
+                    batch_size = max(1, int(self.__performance_settings['classification_batch_size']))
+                    model.predict_on_batch(np.zeros((batch_size, 224, 224, 3), dtype='float32'))
+                else:
+                    batch_size = max(1, int(self.__performance_settings['detection_batch_size']))
+                    model([np.zeros((height, width, 3), dtype=np.uint8)] * batch_size, verbose=False)
+
+                self.__warmup_timings[name] = {
+                    'load': loaded - start,
+                    'warmup': time.perf_counter() - loaded
+                }
+                self.__model_warmed[name].set()
+            self.__readiness = 'ready'
+        except:
+            self.__readiness = 'error'
+            raise
+        finally:
+            # при ошибке ожидающие не должны зависнуть
+            for name in names:
+                self.__model_warmed[name].set()
+            self.__warmup_finished.set()
+
+        print('warmup', self.__warmup_timings)
+        return dict(self.__warmup_timings)
+
+    def warmup_async(self, names=None, frame_size=None):
+        """
+        Прогрев моделей в фоновом потоке (см. warmup, load_models_async).
+        Возвращает запущенный поток; дождаться готовности можно через wait_ready.
+        """
+        self.__start_warmup(names or self.MODEL_NAMES)
+
+        def warm():
+            try:
+                self.warmup(names, frame_size)
+            except Exception as e:
+                print('warmup_async', e)
+
+        thread = threading.Thread(target=warm, daemon=True)
+        thread.start()
+        return thread
+
+    def __start_warmup(self, names):
+        """
+        Отметка начала прогрева моделей names: прежние результаты их прогрева сбрасываются.
+        """
+        self.__readiness = 'warming_up'
+        self.__warmup_finished.clear()
+        self.__warming_names = set(names)
+        for name in names:
+            self.__warmup_timings.pop(name, None)
+            self.__model_warmed[name].clear()
+
+    def get_readiness(self):
+        return self.__readiness
+
+    def is_ready(self):
+        return self.__readiness == 'ready'
+
+    def wait_ready(self, timeout=None, names=None):
+        """
+        Ожидание окончания прогрева моделей names (по умолчанию - всего прогрева).
+        Возвращает True, если эти модели прогреты.
+        Если прогрев не запускался, возвращает False сразу (модели загрузятся при первом обращении);
+        модели, не входящие в последний запущенный прогрев, не ожидаются.
+        """
+        if self.__readiness == 'not_started':
+            return False
+        if names is None:
+            self.__warmup_finished.wait(timeout)
+            return self.__readiness == 'ready'
+        deadline = None if timeout is None else time.perf_counter() + timeout
+        for name in names:
+            if name not in self.__warming_names:
+                continue
+            remaining = None if deadline is None else max(0.0, deadline - time.perf_counter())
+            self.__model_warmed[name].wait(remaining)
+        return all(name in self.__warmup_timings for name in names)
+
+    def get_warmup_timings(self):
+        return dict(self.__warmup_timings)
 
     def get_allowed_params(self):
         return self.__allowed_params_values
@@ -542,6 +854,66 @@ class ProcessingClass:
     def set_manual_methods(self, manual_methods):
         self.__manual_methods = manual_methods
 
+    def get_methods_state(self):
+        """
+        Состояние ручных методов (выбранные методы и значения параметров) без ссылок на функции -
+        в таком виде его можно передать в другой процесс.
+        """
+        return {
+            defect_key: {
+                method_key: {
+                    'checked': method['checked'],
+                    'params': {name: config['value'] for name, config in (method['params'] or {}).items()}
+                }
+                for method_key, method in defect['methods'].items()
+            }
+            for defect_key, defect in self.__manual_methods.items()
+        }
+
+    def set_methods_state(self, state):
+        """
+        Применение состояния ручных методов, полученного через get_methods_state.
+        """
+        for defect_key, methods_state in state.items():
+            for method_key, method_state in methods_state.items():
+                method = self.__manual_methods[defect_key]['methods'][method_key]
+                method['checked'] = method_state['checked']
+                for name, value in method_state['params'].items():
+                    method['params'][name]['value'] = value
+
+    def get_performance_settings(self):
+        return self.__performance_settings
+
+    def set_performance_settings(self, **settings):
+        """
+        Изменение настроек производительности (только существующих ключей).
+        """
+        for key, value in settings.items():
+            if key not in self.__performance_settings:
+                raise KeyError(f"Неизвестная настройка: {key}")
+            previous = self.__performance_settings[key]
+            self.__performance_settings[key] = value
+            if key == 'classification_cache_mb':
+                self.__classification_cache.set_max_memory(value)
+            elif key in ['jpeg_quality', 'png_compression']:
+                setattr(self.__image_writer, key, value)
+            elif key == 'prefilter_thresholds':
+                self.__prefilter.thresholds = value
+            elif key == 'gradient_magnitude':
+                self.__gradient_mask_builder.magnitude = value
+            elif key in ['classifier_backend', 'classifier_threads', 'classifier_int8_path'] and value != previous:
+                # классификатор пересоздается при следующем обращении,
+                # результаты прежней среды выполнения в кэше не используются
+                self.__models.pop('model', None)
+                self.__classification_cache.clear()
+            elif key == 'detection_backend' and value != previous:
+                # модели распознавания объектов перезагружаются при следующем обращении
+                self.__models.pop('yolo_raw_model', None)
+                self.__models.pop('yolo_best_model', None)
+
+    def get_classification_cache(self):
+        return self.__classification_cache
+
     # ================================================================================
     # ФУНКЦИИ ДЛЯ ИСПРАВЛЕНИЯ РАЗМЫТЫХ ИЗОБРАЖЕНИЙ
     # ================================================================================
@@ -577,22 +949,17 @@ class ProcessingClass:
         """
         Выполняет гистограммное выравнивание - сначала преобразует картинку в нужное цветовое пространство, 
         а затем применяет преобразование лишь к каналу яркости.
+        image - изображение или ColorImage (с кэшем цветовых пространств).
         """
-        if color_space_hist == 'yuv':
-            converted_image = cv2.cvtColor(image, cv2.COLOR_BGR2YUV)
-            channels = list(cv2.split(converted_image))
-            index = 0  # Y-канал (яркость)
-        elif color_space_hist == 'hsv':
-            converted_image = cv2.cvtColor(image, cv2.COLOR_BGR2HSV)
-            channels = list(cv2.split(converted_image))
-            index = 2  # V-канал (яркость)
-
-        channels[index] = cv2.equalizeHist(channels[index])
-        image_hist = cv2.merge(channels)
-        if color_space_hist == 'yuv':
-            image_hist = cv2.cvtColor(image_hist, cv2.COLOR_YUV2BGR)
-        elif color_space_hist == 'hsv':
-            image_hist = cv2.cvtColor(image_hist, cv2.COLOR_HSV2BGR)
+        image = ColorImage.wrap(image)
+        channel = image.brightness(color_space_hist)
+        # при обработке видео таблица выравнивания общая для соседних кадров (см. TemporalEqualizer)
+        equalizer = getattr(self.__video_state, 'equalizer', None)
+        if equalizer is not None:
+            equalized = equalizer.apply(channel, color_space_hist)
+        else:
+            equalized = cv2.equalizeHist(channel)
+        image_hist = image.replace_brightness(color_space_hist, equalized)
 
         return image_hist
     
@@ -603,25 +970,28 @@ class ProcessingClass:
         по остальным столбикам.
         """
         print('clahe')
-        if color_space_hist == 'yuv':
-            converted_image = cv2.cvtColor(image, cv2.COLOR_BGR2YUV)
-            channels = list(cv2.split(converted_image))
-            index = 0  # Y-канал (яркость)
-        elif color_space_hist == 'hsv':
-            converted_image = cv2.cvtColor(image, cv2.COLOR_BGR2HSV)
-            channels = list(cv2.split(converted_image))
-            index = 2  # V-канал (яркость)
-
-        clahe = cv2.createCLAHE(clip_limit, tile_grid_size)
-        channels[index] = clahe.apply(channels[index])
-
-        image_clahe = cv2.merge(channels)
-        if color_space_hist == 'yuv':
-            image_clahe = cv2.cvtColor(image_clahe, cv2.COLOR_YUV2BGR)
-        elif color_space_hist == 'hsv':
-            image_clahe = cv2.cvtColor(image_clahe, cv2.COLOR_HSV2BGR)
+        image = ColorImage.wrap(image)
+
+        clahe = self.__get_clahe(clip_limit, tile_grid_size)
+        equalized = clahe.apply(image.brightness(color_space_hist))
+
+        image_clahe = image.replace_brightness(color_space_hist, equalized)
 
         return image_clahe
+
+    def __get_clahe(self, clip_limit, tile_grid_size):
+        """
+        Объект CLAHE с заданными параметрами: создается один раз на поток
+        (объект хранит промежуточные буферы, поэтому потоки его не разделяют).
+        """
+        key = (float(clip_limit), tuple(tile_grid_size))
+        objects = getattr(self.__clahe, 'objects', None)
+        if objects is None:
+            objects = self.__clahe.objects = {}
+        clahe = objects.get(key)
+        if clahe is None:
+            clahe = objects[key] = cv2.createCLAHE(*key)
+        return clahe
     
     
     # ================================================================================
@@ -656,7 +1026,7 @@ class ProcessingClass:
         Исправляет блики на изображении с использованием маски на основе яркости, градиента или их комбинации.
         Принимает следующие параметры:
 
-        image: исходное изображение;
+        image: исходное изображение (или ColorImage с кэшем цветовых пространств);
         color_space_mask: цветовое пространство для создания маски ('yuv', 'hsv', 'gray');
         color_space: цветовое пространство для восстановления ('rgb', 'yuv', 'hsv', 'gray');
         threshold: порог для создания маски на основе яркости;
@@ -674,85 +1044,21 @@ class ProcessingClass:
         if flags == 'inpaint_ns': inpaint_mode = cv2.INPAINT_NS
         elif flags == 'inpaint_telea': inpaint_mode = cv2.INPAINT_TELEA
 
-        # преобразование изображения в нужное цветовое пространство для маски
-        if color_space_mask == 'yuv':
-            converted_image = cv2.cvtColor(image, cv2.COLOR_BGR2YUV)
-            channels = list(cv2.split(converted_image))
-            index = 0  # Y-канал (яркость)
-        elif color_space_mask == 'hsv':
-            converted_image = cv2.cvtColor(image, cv2.COLOR_BGR2HSV)
-            channels = list(cv2.split(converted_image))
-            index = 2  # V-канал (яркость)
-        elif color_space_mask == 'gray':
-            converted_image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-            channels = [converted_image]
-            index = 0
-
-        # создание маски на основе яркости
-        if mask_mode in ['brightness', 'combine']:
-            _, brightness_mask = cv2.threshold(channels[index], threshold, 255, cv2.THRESH_BINARY)
-        else:
-            brightness_mask = None
-
-        # создание маски на основе градиента
-        if mask_mode in ['gradient', 'combine']:
-            if gradient_method == 'sobel':
-                grad_x = cv2.Sobel(channels[index], cv2.CV_64F, 1, 0, ksize=3)
-                grad_y = cv2.Sobel(channels[index], cv2.CV_64F, 0, 1, ksize=3)
-                gradient = np.sqrt(grad_x**2 + grad_y**2)
-            elif gradient_method == 'scharr':
-                grad_x = cv2.Scharr(channels[index], cv2.CV_64F, 1, 0)
-                grad_y = cv2.Scharr(channels[index], cv2.CV_64F, 0, 1)
-                gradient = np.sqrt(grad_x**2 + grad_y**2)
-            elif gradient_method == 'laplacian':
-                gradient = cv2.Laplacian(channels[index], cv2.CV_64F)
-
-            # нормализация градиента и создание маски
-            gradient = cv2.normalize(gradient, None, 0, 255, cv2.NORM_MINMAX, cv2.CV_8U)
-            _, gradient_mask = cv2.threshold(gradient, gradient_threshold, 255, cv2.THRESH_BINARY)
-        else:
-            gradient_mask = None
-
-        # комбинирование масок (если требуется)
-        if mask_mode == 'combine':
-            if brightness_mask is not None and gradient_mask is not None:
-                mask = cv2.bitwise_or(brightness_mask, gradient_mask)  # Объединение масок
-        elif mask_mode == 'brightness':
-            mask = brightness_mask
-        elif mask_mode == 'gradient':
-            mask = gradient_mask
-
-        # восстановление изображения
-        if color_space == 'rgb':
-            inpaint_image = cv2.inpaint(image, mask, inpaintRadius=inpaint_radius, flags=inpaint_mode)
-        else:
-            if color_space == 'yuv':
-                img_converted = cv2.cvtColor(image, cv2.COLOR_BGR2YUV)
-                img_channels = list(cv2.split(img_converted))
-            elif color_space == 'hsv':
-                img_converted = cv2.cvtColor(image, cv2.COLOR_BGR2HSV)
-                img_channels = list(cv2.split(img_converted))
-            elif color_space == 'gray':
-                img_channels = [cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)]
-                
-            bright_channel_idx = 0 if color_space == 'yuv' else 2 if color_space == 'hsv' else 0
-            img_channels[bright_channel_idx] = cv2.inpaint(
-                img_channels[bright_channel_idx], 
-                mask, 
-                inpaintRadius=inpaint_radius, 
-                flags=inpaint_mode
-            )
-
-            # Собираем обратно
-            inpaint_image = cv2.merge(img_channels)
-            if color_space == 'yuv':
-                inpaint_image = cv2.cvtColor(inpaint_image, cv2.COLOR_YUV2BGR)
-            elif color_space == 'hsv':
-                inpaint_image = cv2.cvtColor(inpaint_image, cv2.COLOR_HSV2BGR)
-            elif color_space == 'gray':
-                inpaint_image = cv2.cvtColor(inpaint_image, cv2.COLOR_GRAY2BGR)
-
-        return inpaint_image
+        # маска на основе яркости: пиксели ярче порога
+        def brightness(channel):
+            _, brightness_mask = cv2.threshold(channel, threshold, 255, cv2.THRESH_BINARY)
+            return brightness_mask
+
+        image = ColorImage.wrap(image)
+        return self.__correct_glares(
+            image,
+            ('simple', color_space_mask, color_space, threshold, inpaint_radius, flags, mask_mode,
+             gradient_method, gradient_threshold),
+            lambda: self.__glare_mask(image, color_space_mask, mask_mode, brightness, gradient_method, gradient_threshold),
+            color_space,
+            inpaint_radius,
+            inpaint_mode
+        )
     
     # def adaptive_inpaint(
     #     self,
@@ -788,7 +1094,7 @@ class ProcessingClass:
         минус заданная константа).
         Принимает следующие параметры:
 
-        image: исходное изображение;
+        image: исходное изображение (или ColorImage с кэшем цветовых пространств);
         color_space_mask: цветовое пространство для создания маски ('yuv', 'hsv', 'gray');
         color_space: цветовое пространство для восстановления ('rgb', 'yuv', 'hsv', 'gray');
         threshold: порог для создания маски на основе яркости;
@@ -808,92 +1114,111 @@ class ProcessingClass:
         if adaptive_method == 'gaussian_av': adaptive_mode = cv2.ADAPTIVE_THRESH_GAUSSIAN_C
         elif adaptive_method == 'mean': adaptive_mode = cv2.ADAPTIVE_THRESH_MEAN_C
 
-        # преобразование изображения в нужное цветовое пространство для маски
-        if color_space_mask == 'yuv':
-            converted_image = cv2.cvtColor(image, cv2.COLOR_BGR2YUV)
-            channels = list(cv2.split(converted_image))
-            index = 0  # Y-канал (яркость)
-        elif color_space_mask == 'hsv':
-            converted_image = cv2.cvtColor(image, cv2.COLOR_BGR2HSV)
-            channels = list(cv2.split(converted_image))
-            index = 2  # V-канал (яркость)
-        elif color_space_mask == 'gray':
-            converted_image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-            channels = [converted_image]
-            index = 0
-
-        # создание маски на основе яркости
-        if mask_mode in ['brightness', 'combine']:
-            brightness_mask = cv2.adaptiveThreshold(
-                channels[index], 
+        # маска на основе яркости: пиксели ярче адаптивного порога
+        def brightness(channel):
+            return cv2.adaptiveThreshold(
+                channel, 
                 255, 
                 adaptive_mode, 
                 cv2.THRESH_BINARY, 
                 block_size, 
                 C
             )
+
+        image = ColorImage.wrap(image)
+        return self.__correct_glares(
+            image,
+            ('adaptive', color_space_mask, color_space, adaptive_method, block_size, C, inpaint_radius, flags,
+             mask_mode, gradient_threshold, gradient_method),
+            lambda: self.__glare_mask(image, color_space_mask, mask_mode, brightness, gradient_method, gradient_threshold),
+            color_space,
+            inpaint_radius,
+            inpaint_mode
+        )
+    
+
+    def __correct_glares(self, image, key, build_mask, color_space, inpaint_radius, inpaint_mode):
+        """
+        Построение маски бликов (build_mask) и восстановление по ней.
+        При обработке видео с переиспользованием масок (glare_mask_reuse) маска, построенная
+        по тем же параметрам key, берется с предыдущих кадров, если кадр почти не изменился,
+        а при совсем малых изменениях берутся и восстановленные пиксели (см. GlareMaskTracker).
+        """
+        tracker = getattr(self.__video_state, 'glare_tracker', None)
+        if tracker is None:
+            return self.__restore_glares(image, build_mask(), color_space, inpaint_radius, inpaint_mode)
+
+        mask, previous_result = tracker.lookup(image.image, key)
+        if previous_result is not None:
+            return GlareMaskTracker.paste(image.image, mask, previous_result)
+        if mask is None:
+            mask = build_mask()
+            tracker.store(key, mask=mask)
+        inpaint_image = self.__restore_glares(image, mask, color_space, inpaint_radius, inpaint_mode)
+        tracker.store(key, result=inpaint_image)
+        return inpaint_image
+
+    def __glare_mask(self, image, color_space_mask, mask_mode, brightness, gradient_method, gradient_threshold):
+        """
+        Маска бликов по яркости (brightness - функция от канала яркости), градиенту или их комбинации.
+        """
+        # канал яркости в нужном цветовом пространстве для маски
+        channel = image.brightness(color_space_mask)
+
+        # создание маски на основе яркости
+        if mask_mode in ['brightness', 'combine']:
+            brightness_mask = brightness(channel)
         else:
             brightness_mask = None
 
         # создание маски на основе градиента
         if mask_mode in ['gradient', 'combine']:
-            if gradient_method == 'sobel':
-                grad_x = cv2.Sobel(channels[index], cv2.CV_64F, 1, 0, ksize=3)
-                grad_y = cv2.Sobel(channels[index], cv2.CV_64F, 0, 1, ksize=3)
-                gradient = np.sqrt(grad_x**2 + grad_y**2)
-            elif gradient_method == 'scharr':
-                grad_x = cv2.Scharr(channels[index], cv2.CV_64F, 1, 0)
-                grad_y = cv2.Scharr(channels[index], cv2.CV_64F, 0, 1)
-                gradient = np.sqrt(grad_x**2 + grad_y**2)
-            elif gradient_method == 'laplacian':
-                gradient = cv2.Laplacian(channels[index], cv2.CV_64F)
-
-            # нормализация градиента и создание маски
-            gradient = cv2.normalize(gradient, None, 0, 255, cv2.NORM_MINMAX, cv2.CV_8U)
-            _, gradient_mask = cv2.threshold(gradient, gradient_threshold, 255, cv2.THRESH_BINARY)
+            gradient_mask = self.__gradient_mask_builder.build(channel, gradient_method, gradient_threshold)
         else:
             gradient_mask = None
 
         # комбинирование масок (если требуется)
         if mask_mode == 'combine':
             if brightness_mask is not None and gradient_mask is not None:
-                mask = cv2.bitwise_or(brightness_mask, gradient_mask)
+                mask = cv2.bitwise_or(brightness_mask, gradient_mask)  # Объединение масок
         elif mask_mode == 'brightness':
             mask = brightness_mask
         elif mask_mode == 'gradient':
             mask = gradient_mask
 
-        # восстановление изображения
+        return mask
+
+    def __restore_glares(self, image, mask, color_space, inpaint_radius, inpaint_mode):
+        """
+        Восстановление изображения по маске бликов в цветовом пространстве color_space
+        ('rgb' - все каналы, иначе - только канал яркости).
+        """
         if color_space == 'rgb':
-            inpaint_image = cv2.inpaint(image, mask, inpaintRadius=inpaint_radius, flags=inpaint_mode)
+            inpaint_image = self.__inpaint(image.image, mask, inpaint_radius, inpaint_mode)
         else:
-            if color_space == 'yuv':
-                img_converted = cv2.cvtColor(image, cv2.COLOR_BGR2YUV)
-                img_channels = list(cv2.split(img_converted))
-            elif color_space == 'hsv':
-                img_converted = cv2.cvtColor(image, cv2.COLOR_BGR2HSV)
-                img_channels = list(cv2.split(img_converted))
-            elif color_space == 'gray':
-                img_channels = [cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)]
-
-            bright_channel_idx = 0 if color_space == 'yuv' else 2 if color_space == 'hsv' else 0
-            img_channels[bright_channel_idx] = cv2.inpaint(
-                img_channels[bright_channel_idx], 
-                mask, 
-                inpaintRadius=inpaint_radius, 
-                flags=inpaint_mode
+            inpainted = self.__inpaint(
+                image.brightness(color_space),
+                mask,
+                inpaint_radius,
+                inpaint_mode
             )
 
-            inpaint_image = cv2.merge(img_channels)
-            if color_space == 'yuv':
-                inpaint_image = cv2.cvtColor(inpaint_image, cv2.COLOR_YUV2BGR)
-            elif color_space == 'hsv':
-                inpaint_image = cv2.cvtColor(inpaint_image, cv2.COLOR_HSV2BGR)
-            elif color_space == 'gray':
-                inpaint_image = cv2.cvtColor(inpaint_image, cv2.COLOR_GRAY2BGR)
+            # Собираем обратно
+            inpaint_image = image.replace_brightness(color_space, inpainted)
 
         return inpaint_image
-    
+
+    def __inpaint(self, image, mask, inpaint_radius, inpaint_mode):
+        """
+        Восстановление по маске: только вокруг областей маски (см. RegionInpaint)
+        или, если это отключено в настройках, по всему изображению.
+        """
+        if self.__performance_settings['inpaint_roi']:
+            return inpaint_regions(
+                image, mask, inpaint_radius, inpaint_mode,
+                max_coverage=self.__performance_settings['inpaint_roi_max_coverage'])
+        return cv2.inpaint(image, mask, inpaintRadius=inpaint_radius, flags=inpaint_mode)
+
 
     # ================================================================================
     # ФУНКЦИИ ДЛЯ ИСПРАВЛЕНИЯ ИЗОБРАЖЕНИЙ С ШУМАМИ
@@ -909,7 +1234,11 @@ class ProcessingClass:
             diff = image - blurred
             noise_level = np.std(diff)
         elif estimate_noise == 'function':
+            # skimage импортируется только при необходимости (долгий импорт)
+            from skimage.restoration import estimate_sigma
             noise_level = estimate_sigma(image, average_sigmas=True, channel_axis=-1)
+        elif estimate_noise == 'fast':
+            noise_level = fast_noise_sigma(image)
         
         if noise_level < 10:
             kernel_size = 3
@@ -931,7 +1260,11 @@ class ProcessingClass:
             diff = image - blurred
             noise_level = np.std(diff)
         elif estimate_noise == 'function':
+            # skimage импортируется только при необходимости (долгий импорт)
+            from skimage.restoration import estimate_sigma
             noise_level = estimate_sigma(image, average_sigmas=True, channel_axis=-1)
+        elif estimate_noise == 'fast':
+            noise_level = fast_noise_sigma(image)
         if noise_level < 10:
             kernel_size = 3
         elif noise_level < 30:
@@ -952,7 +1285,11 @@ class ProcessingClass:
             diff = image - blurred
             noise_level = np.std(diff)
         elif estimate_noise == 'function':
+            # skimage импортируется только при необходимости (долгий импорт)
+            from skimage.restoration import estimate_sigma
             noise_level = estimate_sigma(image, average_sigmas=True, channel_axis=-1)
+        elif estimate_noise == 'fast':
+            noise_level = fast_noise_sigma(image)
         
         if noise_level < 10:
             sigma = 1
@@ -968,6 +1305,8 @@ class ProcessingClass:
         """
         Подходит только для одноканальных изображений.
         """
+        import pywt
+        from skimage.restoration import denoise_wavelet, estimate_sigma
         coeffs = pywt.wavedec2(data=image, wavelet=type, level=number_of_levels)
         if estimate_noise == 'gaussian':
             blurred = cv2.GaussianBlur(image, (0, 0), sigma)
@@ -978,6 +1317,8 @@ class ProcessingClass:
             noise_level = np.std(detail_coeffs)
         elif estimate_noise == 'function':
             noise_level = estimate_sigma(image, average_sigmas=True, channel_axis=-1)
+        elif estimate_noise == 'fast':
+            noise_level = fast_noise_sigma(image)
         denoised_image = denoise_wavelet(image, sigma=noise_level, wavelet=type, rescale_sigma=True, mode=mode, wavelet_levels=number_of_levels)
         return denoised_image
     
@@ -1016,30 +1357,16 @@ class ProcessingClass:
     def __cv2_imread_unicode(self, path):
         """
         Аналог cv2.imread() с поддержкой Unicode-путей.
+        Файл читается в память и декодируется из буфера (см. ImageIO).
         """
-        # создаем временный файл с ASCII-именем (в папке C:\Users\ВАШ_ПОЛЬЗОВАТЕЛЬ\AppData\Local\Temp)
-        with tempfile.NamedTemporaryFile(suffix='.jpg', delete=False) as tmp:
-            temp_path = tmp.name
-        # копируем оригинальный файл во временный
-        shutil.copy2(path, temp_path)
-        # читаем временный файл
-        img = cv2.imread(temp_path)
-        # удаляем временный файл
-        os.unlink(temp_path)
-        return img
+        return imread_unicode(path)
 
     def __cv2_imwrite_unicode(self, path, img):
         """
         Аналог cv2.imwrite() с поддержкой Unicode-путей.
+        Изображение кодируется в памяти в формат расширения пути (см. ImageIO).
         """
-        # создаем временный файл
-        with tempfile.NamedTemporaryFile(suffix='.jpg', delete=False) as tmp:
-            temp_path = tmp.name
-        # сохраняем во временный файл
-        cv2.imwrite(temp_path, img)
-        # перемещаем в конечный путь с Unicode-именем
-        shutil.move(temp_path, path)
-        return True
+        return self.__image_writer.write(path, img)
 
 
     # def process_image(self, image, processing_method, output_path=None, *args, **kwargs):
@@ -1052,26 +1379,490 @@ class ProcessingClass:
     #     if output_path: cv2.imwrite(output_path, processed_image)
     #     return processed_image
 
-    def determine_class(self, img):
+    def determine_class(self, img, prefilter=True):
         """
         Классификация.
         """
-        img_height, img_width = 224, 224
-        img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-        img = cv2.resize(img, (img_height, img_width))
-        img = img.astype('float32') / 255.0
-        img = np.expand_dims(img, axis=0)
+        return self.determine_classes([img], prefilter=prefilter)[0]
+
+    def determine_classes(self, images, batch_size=None, prefilter=True):
+        """
+        Пакетная классификация.
+        Принимает список изображений или массив формы (N, H, W, 3),
+        модель вызывается один раз на каждый пакет размером batch_size.
+        Перед моделью стоит LRU-кэш по хэшу пикселей уменьшенного до входа модели изображения,
+        поэтому повторно встреченные изображения не классифицируются заново.
+        При включенной настройке quality_prefilter перед моделью работает быстрая проверка
+        качества (см. QualityPrefilter): 'shadow' - только статистика согласия с моделью,
+        'skip' - заведомо чистые изображения классифицируются как 'good' без модели
+        (вероятность класса у них неизвестна - вместо нее None).
+        prefilter=False отключает проверку: так классифицируются уже исправленные изображения,
+        чтобы проверка исправления всегда выполнялась моделью.
+        Возвращает список [predicted_class, predicted_property] для каждого изображения.
+        """
+        if batch_size is None:
+            batch_size = self.__performance_settings['classification_batch_size']
+        batch_size = max(1, int(batch_size))
+
+        cache = self.__classification_cache
+        use_cache = cache.is_enabled()
+        quality_prefilter = self.__prefilter
+        prefilter_mode = self.__performance_settings['quality_prefilter'] if prefilter else None
+
+        predictions = []
+        for start in range(0, len(images), batch_size):
+            # приводим изображения к размеру входа модели (в буфер потока, без промежуточных копий)
+            batch = self.__classifier_batch(images[start:start + batch_size])
+
+            # ищем уже классифицированные изображения в кэше (по хэшу входа модели)
+            batch_predictions = [None] * len(batch)
+            keys = [None] * len(batch)
+            if use_cache:
+                for i, img in enumerate(batch):
+                    keys[i] = cache.make_key(img)
+                    batch_predictions[i] = cache.get(keys[i])
+
+            # модель вызывается только для изображений, которых нет в кэше
+            missing = [i for i, result in enumerate(batch_predictions) if result is None]
+
+            # предварительная проверка качества: заведомо чистые изображения в режиме 'skip'
+            # получают класс 'good' без классификатора (в кэш такие результаты не попадают)
+            candidates = {}
+            if prefilter_mode and quality_prefilter.thresholds and missing:
+                for i in missing:
+                    candidates[i] = quality_prefilter.check(quality_prefilter.measure(batch[i]))
+                    if prefilter_mode == 'skip' and candidates[i] == []:
+                        batch_predictions[i] = ['good', None]
+                        quality_prefilter.record(candidates[i])
+                missing = [i for i in missing if batch_predictions[i] is None]
+
+            if missing:
+                model_batch = self.__classifier_tensor(batch, missing)
+                prediction = np.asarray(self.model.predict_on_batch(model_batch))
+                predicted_class_indexes = np.argmax(prediction, axis=1)
+                for i, row, predicted_class_index in zip(missing, prediction, predicted_class_indexes):
+                    batch_predictions[i] = [self.class_names[predicted_class_index], row[predicted_class_index]]
+                    if use_cache: cache.put(keys[i], batch_predictions[i])
+                    if i in candidates: quality_prefilter.record(candidates[i], batch_predictions[i][0])
+
+            predictions.extend(batch_predictions)
+
+        return predictions
+
+    def __classifier_buffers(self, size):
+        """
+        Буферы входа классификатора текущего потока: uint8 для уменьшенных изображений
+        и float32 для входного тензора модели. Выделяются заново только при росте пакета.
+        """
+        buffers = self.__batch_buffers
+        if getattr(buffers, 'size', 0) < size:
+            buffers.size = size
+            buffers.inputs = np.empty((size, 224, 224, 3), dtype=np.uint8)
+            buffers.tensor = np.empty((size, 224, 224, 3), dtype=np.float32)
+        return buffers.inputs, buffers.tensor
+
+    def __classifier_batch(self, images):
+        """
+        Уменьшение изображений до входа классификатора (224x224) сразу в ячейки буфера потока.
+        Каналы остаются в порядке BGR (перестановка - при заполнении тензора).
+        Полутоновые и BGRA-изображения приводятся к BGR; изображения других типов и с другим
+        числом каналов не принимаются.
+        Возвращает представление буфера формы (N, 224, 224, 3); оно действительно до следующего вызова.
+        """
+        inputs, _ = self.__classifier_buffers(len(images))
+        for i, img in enumerate(images):
+            if img.dtype != np.uint8:
+                raise ValueError(f'Классификатор принимает изображения uint8, получено {img.dtype}')
+            if img.ndim == 2 or img.shape[2] == 1:
+                img = cv2.cvtColor(img, cv2.COLOR_GRAY2BGR)
+            elif img.shape[2] == 4:
+                img = cv2.cvtColor(img, cv2.COLOR_BGRA2BGR)
+            elif img.shape[2] != 3:
+                raise ValueError(f'Классификатор принимает изображения с 1, 3 или 4 каналами, получено {img.shape}')
+            # cv2.resize пишет в dst только при совпадении типа и числа каналов,
+            # иначе в ячейке остались бы данные прежнего пакета
+            cv2.resize(img, (224, 224), dst=inputs[i])
+        return inputs[:len(images)]
+
+    def __classifier_tensor(self, batch, indexes=None):
+        """
+        Входной тензор модели float32 для изображений batch[indexes] (по умолчанию - всех):
+        перестановка каналов BGR -> RGB и масштабирование в [0, 1] одной операцией
+        на изображение с записью в буфер потока.
+        """
+        if indexes is None:
+            indexes = range(len(batch))
+        _, tensor = self.__classifier_buffers(len(batch))
+        for row, i in enumerate(indexes):
+            np.multiply(batch[i][..., ::-1], np.float32(1 / 255.0), out=tensor[row], dtype=np.float32, casting='unsafe')
+        return tensor[:len(indexes)]
+
+    def check_classifier_parity(self, images, backend=None, sample_size=64):
+        """
+        Проверка совпадения предсказаний среды выполнения backend (по умолчанию - текущей)
+        с исходной Keras-моделью. images - список изображений или путь к папке,
+        из которой берутся первые sample_size изображений.
+        Возвращает словарь (см. ClassifierBackends.compare_predictions).
+        """
+        settings = self.__performance_settings
+        backend = backend or settings['classifier_backend']
+
+        if isinstance(images, (str, Path)):
+            images = self.__load_sample_images(images, sample_size)
+
+        reference = create_classifier('keras', self.model_path)
+        if backend == settings['classifier_backend']:
+            candidate = self.model
+        else:
+            candidate = create_classifier(
+                backend, self.model_path, num_threads=settings['classifier_threads'],
+                int8_path=settings['classifier_int8_path'])
+
+        reference_predictions = []
+        candidate_predictions = []
+        for batch in self.__iter_batches(images, settings['classification_batch_size']):
+            model_batch = self.__classifier_tensor(self.__classifier_batch(batch))
+            reference_predictions.append(reference.predict_on_batch(model_batch))
+            candidate_predictions.append(np.asarray(candidate.predict_on_batch(model_batch)))
+        if not reference_predictions:
+            return None
+
+        result = compare_predictions(
+            np.concatenate(reference_predictions),
+            np.concatenate(candidate_predictions),
+            self.class_names
+        )
+        result['backend'] = backend
+        print(result)
+        return result
+
+    def __load_sample_images(self, folder, sample_size):
+        """
+        Первые sample_size изображений папки (нечитаемые файлы пропускаются).
+        """
+        images = []
+        for image_name in sorted(os.listdir(folder))[:sample_size]:
+            image = self.__cv2_imread_unicode(os.path.join(folder, image_name))
+            if image is not None: images.append(image)
+        return images
+
+    def calibrate_prefilter(self, images, target_precision=0.99, sample_size=500):
+        """
+        Подбор порогов предварительной проверки качества по предсказаниям классификатора
+        (см. QualityPrefilter.calibrate). images - список изображений или путь к папке,
+        из которой берутся первые sample_size изображений.
+        Пороги сохраняются в настройке prefilter_thresholds.
+        Возвращает словарь: пороги, доля изображений, признанных чистыми, и точность на выборке.
+        """
+        if isinstance(images, (str, Path)):
+            images = self.__load_sample_images(images, sample_size)
+
+        # метрики считаются на том же уменьшенном входе, что и при классификации
+        metrics = []
+        predicted_classes = []
+        for batch_images in self.__iter_batches(images, self.__performance_settings['classification_batch_size']):
+            batch = self.__classifier_batch(batch_images)
+            metrics.extend(self.__prefilter.measure(img) for img in batch)
+            prediction = np.asarray(self.model.predict_on_batch(self.__classifier_tensor(batch)))
+            predicted_classes.extend(self.class_names[index] for index in np.argmax(prediction, axis=1))
+
+        thresholds, clean_rate, precision = QualityPrefilter.calibrate(metrics, predicted_classes, target_precision)
+        self.set_performance_settings(prefilter_thresholds=thresholds)
+        result = {
+            'thresholds': thresholds,
+            'clean_rate': clean_rate,
+            'precision': precision,
+            'samples': len(metrics)
+        }
+        print(result)
+        return result
+
+    def validate_noise_estimator(self, images, sample_size=100):
+        """
+        Сравнение быстрой оценки шума ('fast') с skimage estimate_sigma ('function').
+        images - список изображений или путь к папке (первые sample_size изображений).
+        Возвращает словарь (см. ImageMetrics.compare_noise_estimators).
+        """
+        if isinstance(images, (str, Path)):
+            images = self.__load_sample_images(images, sample_size)
+        result = compare_noise_estimators(images)
+        print(result)
+        return result
+
+    def get_prefilter_stats(self):
+        return self.__prefilter.get_stats()
+
+    def quantize_classifier(self, calibration_path, evaluation_path, max_images=300):
+        """
+        INT8-квантование классификатора по изображениям из calibration_path и сравнение
+        точности с исходной моделью по каждому классу на отдельных изображениях evaluation_path
+        (папки не должны пересекаться), см. ClassifierQuantization.
+        Квантованная модель сохраняется по пути classifier_int8_path (по умолчанию - рядом
+        с исходной) и используется при classifier_backend = 'tflite_int8'.
+        Возвращает отчет (см. ClassifierQuantization.evaluate_int8).
+        """
+        check_evaluation_path(calibration_path, evaluation_path)
+        quantized_path = quantize_int8(
+            self.model_path, calibration_path,
+            output_path=self.__performance_settings['classifier_int8_path'],
+            max_images=max_images)
+        report = evaluate_int8(
+            self.model_path,
+            quantized_path,
+            evaluation_path,
+            self.class_names,
+            batch_size=self.__performance_settings['classification_batch_size']
+        )
+        print(format_report(report))
+
+        # уже загруженная INT8-модель заменяется новой при следующем обращении
+        if self.__performance_settings['classifier_backend'] == 'tflite_int8':
+            self.__models.pop('model', None)
+            self.__classification_cache.clear()
+        return report
+
+    def __merge_results(self, main_results, results):
+        """
+        Суммирует счетчики результатов по дефектам.
+        """
+        return {
+            key: [
+                main_results[key][0] + results[key][0], 
+                main_results[key][1] + results[key][1]
+            ] 
+            for key in main_results
+        }
+
+    def __often_defect_from_classes(self, predicted_classes):
+        """
+        Самый частый дефект по списку предсказанных классов (None, если дефектов нет).
+        """
+        defects = {
+            'blur': 0,
+            'contrast': 0,
+            'glares': 0,
+            'noise': 0
+        }
+        for predicted_class in predicted_classes:
+            if predicted_class != 'good': defects[predicted_class] += 1
+
+        print(defects)
+        if max(defects.values()) == 0: return None
+        return max(defects, key=defects.get)
+
+    def __iter_batches(self, items, batch_size):
+        """
+        Разбивает последовательность (в том числе генератор) на пакеты-списки.
+        """
+        batch = []
+        for item in items:
+            batch.append(item)
+            if len(batch) == batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def __read_video_frames(self, cap, skip=0, count=None):
+        """
+        Генератор кадров видео в RGB. Первые skip кадров пропускаются без преобразования,
+        count - сколько кадров прочитать (None - до конца видео).
+        """
+        for _ in range(skip):
+            if not cap.grab(): return
+        read = 0
+        while count is None or read < count:
+            read += 1
+            ret, frame = cap.read()
+            if not ret:
+                break
+            # конвертируем BGR (OpenCV) в RGB (для методов обработки)
+            yield cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+
+    def __classify_video_single_pass(self, spill):
+        """
+        Первый (и единственный) проход декодирования для режима 'often_defect':
+        классифицирует все кадры, сохраняет их классы и складывает кадры во временное хранилище.
+        Возвращает (самый частый дефект, список классов кадров).
+        """
+        batch_size = self.__performance_settings['classification_batch_size']
+        cap = cv2.VideoCapture(self.input_path)
+        if not cap.isOpened():
+            return None
+
+        predicted_classes = []
+        for batch in self.__iter_batches(self.__read_video_frames(cap), batch_size):
+            predicted_classes.extend(prediction[0] for prediction in self.determine_classes(batch))
+            for frame in batch:
+                if not spill.append(frame): break
+        cap.release()
+
+        return self.__often_defect_from_classes(predicted_classes), predicted_classes
+
+    def __classify_dataset_single_pass(self, images, spill):
+        """
+        То же для датасета: images - список имен изображений в порядке обработки.
+        """
+        batch_size = self.__performance_settings['classification_batch_size']
+        predicted_classes = []
+        for batch_names in self.__iter_batches(images, batch_size):
+            batch = []
+            for image_name in batch_names:
+                input_image = self.__cv2_imread_unicode(os.path.join(self.input_path, image_name))
+                if input_image is None: return None
+                batch.append(input_image)
+
+            predicted_classes.extend(prediction[0] for prediction in self.determine_classes(batch))
+            for input_image in batch:
+                if not spill.append(input_image): break
+
+        return self.__often_defect_from_classes(predicted_classes), predicted_classes
+
+    def __read_dataset_images(self, images, spill=None):
+        """
+        Генератор изображений датасета: сначала из временного хранилища (если есть),
+        остальные - с диска.
+        """
+        spilled = 0
+        if spill is not None:
+            for input_image in spill:
+                spilled += 1
+                yield input_image
+        for image_name in images[spilled:]:
+            yield self.__cv2_imread_unicode(os.path.join(self.input_path, image_name))
+
+    def __create_defect_estimator(self):
+        return DefectEstimator(
+            z=self.__performance_settings['sampling_confidence_z'],
+            min_samples=self.__performance_settings['sampling_min_samples'],
+            min_defect_rate=self.__performance_settings['sampling_min_defect_rate']
+        )
+
+    def __sample_indices(self, total, sampling):
+        """
+        Индексы выборки по настройкам. Для 'adaptive' индексы внутри каждого пакета
+        упорядочиваются, чтобы чтение шло вперед.
+        """
+        settings = self.__performance_settings
+        indices = DefectEstimator.sample_indices(
+            total,
+            sampling,
+            stride=settings['sampling_stride'],
+            sample_size=settings['sampling_size'],
+            seed=settings['sampling_seed']
+        )
+        if sampling == 'adaptive':
+            batch_size = settings['classification_batch_size']
+            indices = [index for chunk in self.__iter_batches(indices, batch_size) for index in sorted(chunk)]
+        return [int(index) for index in indices]
+
+    def __read_video_frames_strided(self, cap, stride):
+        """
+        Генератор каждого stride-го кадра видео в RGB (остальные кадры только пропускаются).
+        """
+        index = 0
+        while True:
+            if index % stride == 0:
+                ret, frame = cap.read()
+                if not ret:
+                    break
+                yield cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            elif not cap.grab():
+                break
+            index += 1
+
+    def __read_video_frames_at(self, cap, indices):
+        """
+        Генератор кадров видео в RGB с заданными номерами.
+        Близкие кадры достигаются пропуском (grab), дальние - перемоткой.
+        """
+        position = int(cap.get(cv2.CAP_PROP_POS_FRAMES))
+        for index in indices:
+            if 0 <= index - position <= 32:
+                for _ in range(index - position):
+                    cap.grab()
+            else:
+                cap.set(cv2.CAP_PROP_POS_FRAMES, index)
+            ret, frame = cap.read()
+            if not ret:
+                # номер кадра мог оказаться за концом видео - следующий кадр ищем перемоткой
+                position = -1
+                continue
+            position = index + 1
+            yield cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+
+    def estimate_often_defect_video(self, sampling=None):
+        """
+        Оценка самого частого дефекта на видео по выборке кадров.
+        sampling: 'full' - все кадры, 'stride' - каждый sampling_stride-й кадр,
+        'random' - sampling_size случайных кадров, 'adaptive' - случайные кадры до тех пор,
+        пока лидирующий дефект не оторвется от второго статистически значимо.
+        Возвращает словарь (см. DefectEstimator.result) или None при ошибке.
+        """
+        settings = self.__performance_settings
+        sampling = sampling or settings['often_defect_sampling'] or 'full'
+        batch_size = settings['classification_batch_size']
+        estimator = self.__create_defect_estimator()
+
+        cap = cv2.VideoCapture(self.input_path)
+        if not cap.isOpened():
+            return None
+        total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+
+        # без известного числа кадров случайная выборка невозможна - берем кадры с шагом
+        if total <= 0 and sampling in ['random', 'adaptive']:
+            sampling = 'stride'
+
+        if sampling in ['full', 'stride']:
+            stride = 1 if sampling == 'full' else max(1, int(settings['sampling_stride']))
+            frames = self.__read_video_frames_strided(cap, stride)
+        else:
+            frames = self.__read_video_frames_at(cap, self.__sample_indices(total, sampling))
+
+        for batch in self.__iter_batches(frames, batch_size):
+            for predicted_class, _ in self.determine_classes(batch):
+                estimator.add(predicted_class)
+            if sampling == 'adaptive' and estimator.is_confident():
+                break
+        cap.release()
+
+        result = estimator.result(total)
+        print(result)
+        return result
+
+    def estimate_often_defect_dataset(self, sampling=None):
+        """
+        Оценка самого частого дефекта датасета по выборке изображений (режимы - см. estimate_often_defect_video).
+        """
+        settings = self.__performance_settings
+        sampling = sampling or settings['often_defect_sampling'] or 'full'
+        batch_size = settings['classification_batch_size']
+        estimator = self.__create_defect_estimator()
+
+        images = os.listdir(self.input_path)
+        for batch_indices in self.__iter_batches(self.__sample_indices(len(images), sampling), batch_size):
+            batch = []
+            for index in batch_indices:
+                input_image = self.__cv2_imread_unicode(os.path.join(self.input_path, images[index]))
+                if input_image is None: return None
+                batch.append(input_image)
 
-        prediction = self.model.predict(img, verbose=0)
-        class_names = ['blur', 'contrast', 'glares', 'good', 'noise']
-        predicted_class_index = np.argmax(prediction, axis=1)[0]
-        predicted_class = class_names[predicted_class_index]
-        predicted_property = prediction[0][predicted_class_index]
+            for predicted_class, _ in self.determine_classes(batch):
+                estimator.add(predicted_class)
+            if sampling == 'adaptive' and estimator.is_confident():
+                break
 
-        return [predicted_class, predicted_property]
+        result = estimator.result(len(images))
+        print(result)
+        return result
 
     def find_often_defect_dataset(self):
         try:
+            # при включенной выборке используем оценку по выборке
+            if self.__performance_settings['often_defect_sampling']:
+                result = self.estimate_often_defect_dataset()
+                return result['often_defect'] if result else None
+
             # словарь с дефектами
             defects = {
                 'blur': 0,
@@ -1079,20 +1870,25 @@ class ProcessingClass:
                 'glares': 0,
                 'noise': 0
             }
+            batch_size = self.__performance_settings['classification_batch_size']
 
             # получаем список имен изображений
             images = os.listdir(self.input_path)
-            for image_name in images:
-                # путь к изображению
-                input_image_path = os.path.join(self.input_path, image_name)
-
-                # загружаем изображение
-                input_image = self.__cv2_imread_unicode(input_image_path)
-                if input_image is None: return None
-
-                # узнаем вид дефекта на изображении
-                predicted_class = self.determine_class(input_image)[0]
-                if predicted_class != 'good': defects[predicted_class] += 1
+            for start in range(0, len(images), batch_size):
+                # загружаем пакет изображений
+                batch = []
+                for image_name in images[start:start + batch_size]:
+                    # путь к изображению
+                    input_image_path = os.path.join(self.input_path, image_name)
+
+                    # загружаем изображение
+                    input_image = self.__cv2_imread_unicode(input_image_path)
+                    if input_image is None: return None
+                    batch.append(input_image)
+
+                # узнаем вид дефекта на изображениях пакета
+                for predicted_class, _ in self.determine_classes(batch):
+                    if predicted_class != 'good': defects[predicted_class] += 1
             
             often_defect_count = max(defects.values())
             if often_defect_count == 0: often_defect = None
@@ -1103,6 +1899,11 @@ class ProcessingClass:
         
     def find_often_defect_video(self):
         try:
+            # при включенной выборке используем оценку по выборке
+            if self.__performance_settings['often_defect_sampling']:
+                result = self.estimate_often_defect_video()
+                return result['often_defect'] if result else None
+
             # словарь с дефектами
             defects = {
                 'blur': 0,
@@ -1110,24 +1911,29 @@ class ProcessingClass:
                 'glares': 0,
                 'noise': 0
             }
+            batch_size = self.__performance_settings['classification_batch_size']
 
             # открываем видео
             cap = cv2.VideoCapture(self.input_path)
             if not cap.isOpened():
                 return None
 
-            # идем по кадрам
+            # идем по кадрам, собирая их в пакеты
+            batch = []
             while True:
                 ret, frame = cap.read()
+                if ret:
+                    # конвертируем BGR (OpenCV) в RGB (для методов обработки)
+                    batch.append(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+
+                if batch and (not ret or len(batch) == batch_size):
+                    # узнаем вид дефекта на кадрах пакета
+                    for predicted_class, _ in self.determine_classes(batch):
+                        if predicted_class != 'good': defects[predicted_class] += 1
+                    batch = []
+
                 if not ret:
                     break
-
-                # конвертируем BGR (OpenCV) в RGB (для методов обработки)
-                rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                
-                # узнаем вид дефекта на кадре
-                predicted_class = self.determine_class(rgb_frame)[0]
-                if predicted_class != 'good': defects[predicted_class] += 1
             
             # освобождаем ресурсы
             cap.release()
@@ -1140,7 +1946,12 @@ class ProcessingClass:
         except:
             return None
     
-    def recovery(self, input_image, processing_mode, defect_mode, often_class=None):
+    def recovery(self, input_image, processing_mode, defect_mode, often_class=None, predicted_class=None):
+        """
+        Исправление одного изображения.
+        predicted_class - заранее известный класс исходного изображения (например, из пакетной
+        классификации), если не задан - определяется здесь.
+        """
         print('recovery')
 
         # словарь с результатами
@@ -1151,6 +1962,10 @@ class ProcessingClass:
             'noise': [0, 0]
         }
 
+        # методы применяются к исходному изображению, поэтому его цветовые пространства
+        # вычисляются один раз для всех исправлений (см. ColorImage)
+        color_image = ColorImage(input_image)
+
         # применение методов
         def apply_methods(predicted_class):
             print('apply_methods')
@@ -1174,18 +1989,20 @@ class ProcessingClass:
                     params = {param_name: param_config['value'] 
                         for param_name, param_config in defect_method_content['params'].items()}
                     print(params)
-                    processed_image = defect_method_link(input_image, **params)
+                    source = color_image if defect_method_key in self.COLOR_IMAGE_METHODS else input_image
+                    processed_image = defect_method_link(source, **params)
 
             return processed_image
 
         if defect_mode == 'one_defect':
             print(1)
-            predicted_class = self.determine_class(input_image)[0]
+            if predicted_class is None:
+                predicted_class = self.determine_class(input_image)[0]
             print(2)
             if predicted_class != 'good': 
                 results[predicted_class][0] += 1
                 processed_image = apply_methods(predicted_class)
-                processed_predicted_class = self.determine_class(processed_image)[0]
+                processed_predicted_class = self.determine_class(processed_image, prefilter=False)[0]
                 if processed_predicted_class == 'good': results[predicted_class][1] += 1
             else: processed_image = input_image.copy()
 
@@ -1195,7 +2012,10 @@ class ProcessingClass:
             
             while True:
                 uncorrected_defect = ''
-                predicted_class = self.determine_class(processed_image)[0]
+                # класс исходного изображения может быть уже известен
+                # (исправленное изображение проверяется только моделью)
+                if predicted_class is None or defects_in_image:
+                    predicted_class = self.determine_class(processed_image, prefilter=not defects_in_image)[0]
                 if predicted_class in defects_in_image:
                     uncorrected_defect = predicted_class
                     break
@@ -1220,10 +2040,11 @@ class ProcessingClass:
             else:
                 processed_image = apply_methods(often_class)
 
-            predicted_class = self.determine_class(input_image)[0]
+            if predicted_class is None:
+                predicted_class = self.determine_class(input_image)[0]
             if predicted_class != 'good': 
                 results[predicted_class][0] += 1
-                processed_predicted_class = self.determine_class(processed_image)[0]
+                processed_predicted_class = self.determine_class(processed_image, prefilter=False)[0]
                 if processed_predicted_class == 'good': results[predicted_class][1] += 1
         
         return (processed_image, results)
@@ -1254,23 +2075,35 @@ class ProcessingClass:
     def recovery_video(self, processing_mode, defect_mode):
         """
         Восстановление видео.
+        В режиме 'often_defect' (если включен often_defect_single_pass) видео декодируется
+        и классифицируется один раз: классы кадров запоминаются, а сами кадры складываются
+        во временное хранилище, из которого затем берутся для исправления.
+        Чтение, обработка и запись кадров идут конвейером (см. __recover_frames).
         """
+        spill = None
         try:
-            if defect_mode == 'often_defect':
+            # при нескольких процессах видео делится на сегменты, обрабатываемые параллельно
+            segments = self.__video_segments()
+            if len(segments) > 1:
+                return self.__recovery_video_segments(processing_mode, defect_mode, segments)
+
+            # оценка по выборке дешевле полного прохода, поэтому при ней однопроходный режим не нужен
+            single_pass = (defect_mode == 'often_defect'
+                           and self.__performance_settings['often_defect_single_pass']
+                           and not self.__performance_settings['often_defect_sampling'])
+            stored_classes = None
+            if single_pass:
+                spill = FrameSpillCache(self.__performance_settings['frame_spill_limit_mb'])
+                first_pass = self.__classify_video_single_pass(spill)
+                if first_pass is None: return None, None
+                often_class, stored_classes = first_pass
+            elif defect_mode == 'often_defect':
                 often_class = self.find_often_defect_video()
             else:
                 often_class = None
 
             print('OFTEN', often_class)
 
-            # словарь с результатами
-            main_results = {
-                'blur': [0, 0],
-                'contrast': [0, 0],
-                'glares': [0, 0],
-                'noise': [0, 0]
-            }
-
             print(1)
             # формируем необходимое название для сохранения
             video_name = Path(self.input_path).stem
@@ -1295,33 +2128,15 @@ class ProcessingClass:
             out = cv2.VideoWriter(self.processed_path, fourcc, fps, (width, height))
             
             print(5)
-            # обрабатываем каждый кадр
-            while True:
-                print(6)
-                ret, frame = cap.read()
-                if not ret:
-                    break
-                
-                # конвертируем BGR (OpenCV) в RGB (для методов обработки)
-                rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                
-                # применяем выбранный метод обработки
-                processed_frame, results = self.recovery(rgb_frame, processing_mode, defect_mode, often_class)
-                
-                # обновляем словарь с результатами
-                main_results = {
-                    key: [
-                        main_results[key][0] + results[key][0], 
-                        main_results[key][1] + results[key][1]
-                    ] 
-                    for key in main_results
-                }
-                
-                # конвертируем обратно в BGR для сохранения
-                bgr_frame = cv2.cvtColor(processed_frame, cv2.COLOR_RGB2BGR)
-                out.write(bgr_frame)
+            # источник кадров: временное хранилище после первого прохода или само видео
+            if spill is not None:
+                frames = self.__read_spilled_frames(spill, cap)
+            else:
+                frames = self.__read_video_frames(cap)
 
-                print('main_results', main_results)
+            # обрабатываем кадры и записываем результат
+            main_results = self.__recover_frames(
+                frames, out, processing_mode, defect_mode, often_class, stored_classes)
             
             print(7)
             # освобождаем ресурсы
@@ -1335,19 +2150,193 @@ class ProcessingClass:
         
         except Exception as e:
             return None, None
-    
-    def recovery_dataset(self, processing_mode, defect_mode):
+        finally:
+            if spill is not None: spill.close()
+
+    def __recover_frames(self, frames, out, processing_mode, defect_mode, often_class=None, stored_classes=None):
         """
-        Восстановление датасета.
+        Исправление последовательности RGB-кадров с записью в out (cv2.VideoWriter).
+        Кадры обрабатываются пакетами: сначала классифицируется весь пакет (если классы
+        не известны заранее из stored_classes), затем исправляется каждый кадр.
+        При включенном video_pipeline чтение, обработка и запись идут в отдельных потоках.
+        При glare_mask_reuse маски бликов переиспользуются между кадрами (см. GlareMaskTracker),
+        а при video_contrast_smoothing таблица гистограммного выравнивания общая для соседних кадров
+        (см. TemporalEqualizer); это возможно, только если кадры обрабатываются по порядку в одном потоке.
+        Возвращает словарь с результатами.
         """
+        settings = self.__performance_settings
+
+        sequential = not settings['video_pipeline'] or int(settings['video_pipeline_workers']) == 1
+        glare_tracker = None
+        if settings['glare_mask_reuse'] and sequential:
+            glare_tracker = GlareMaskTracker(
+                threshold=settings['glare_reuse_threshold'],
+                max_age=settings['glare_reuse_max_age'],
+                reuse_patches=settings['glare_patch_reuse'],
+                patch_threshold=settings['glare_patch_threshold']
+            )
+        equalizer = None
+        if settings['video_contrast_smoothing'] and sequential:
+            equalizer = TemporalEqualizer(
+                interval=settings['contrast_lut_interval'],
+                alpha=settings['contrast_lut_alpha'],
+                scene_threshold=settings['contrast_scene_threshold']
+            )
+
+        # словарь с результатами
+        main_results = {
+            'blur': [0, 0],
+            'contrast': [0, 0],
+            'glares': [0, 0],
+            'noise': [0, 0]
+        }
+
+        def process_batch(item):
+            frame_index, batch = item
+            print(6)
+            if stored_classes is not None and frame_index + len(batch) <= len(stored_classes):
+                predicted_classes = stored_classes[frame_index:frame_index + len(batch)]
+            else:
+                predicted_classes = [prediction[0] for prediction in self.determine_classes(batch)]
+
+            processed_frames = []
+            batch_results = []
+            self.__video_state.glare_tracker = glare_tracker
+            self.__video_state.equalizer = equalizer
+            try:
+                for rgb_frame, predicted_class in zip(batch, predicted_classes):
+                    # применяем выбранный метод обработки
+                    processed_frame, results = self.recovery(
+                        rgb_frame, processing_mode, defect_mode, often_class, predicted_class)
+                    # возраст масок бликов считается в кадрах, в том числе без исправления бликов
+                    if glare_tracker is not None: glare_tracker.next_frame()
+                    batch_results.append(results)
+                    # конвертируем обратно в BGR для сохранения
+                    processed_frames.append(cv2.cvtColor(processed_frame, cv2.COLOR_RGB2BGR))
+            finally:
+                self.__video_state.glare_tracker = None
+                self.__video_state.equalizer = None
+            return processed_frames, batch_results
+
+        def write_batch(processed):
+            processed_frames, batch_results = processed
+            for bgr_frame, results in zip(processed_frames, batch_results):
+                out.write(bgr_frame)
+                # обновляем словарь с результатами
+                main_results.update(self.__merge_results(main_results, results))
+            print('main_results', main_results)
+
+        batches = self.__enumerate_batches(frames, settings['classification_batch_size'])
+        if settings['video_pipeline']:
+            pipeline = VideoPipeline(
+                workers=settings['video_pipeline_workers'],
+                queue_size=settings['video_pipeline_queue_size']
+            )
+            pipeline.run(batches, process_batch, write_batch)
+        else:
+            for item in batches:
+                write_batch(process_batch(item))
+
+        if glare_tracker is not None:
+            print('glare_masks', glare_tracker.stats)
+        if equalizer is not None:
+            print('contrast_lut', equalizer.stats)
+        return main_results
+
+    def __enumerate_batches(self, items, batch_size):
+        """
+        Пакеты вместе с номером первого элемента пакета.
+        """
+        start = 0
+        for batch in self.__iter_batches(items, batch_size):
+            yield start, batch
+            start += len(batch)
+
+    def __video_segments(self, path=None):
+        """
+        Сегменты видео (start, end) для параллельной обработки по настройкам
+        video_segment_workers и video_min_segment_frames (один сегмент - обработка без деления).
+        Без ffmpeg сегменты не склеить без перекодирования, поэтому видео не делится.
+        """
+        workers = int(self.__performance_settings['video_segment_workers'])
+        if workers <= 1:
+            return [(0, None)]
+        if not can_concat():
+            print('video_segments', 'ffmpeg не найден, видео обрабатывается одним сегментом')
+            return [(0, None)]
+        cap = cv2.VideoCapture(str(path or self.input_path))
+        total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) if cap.isOpened() else 0
+        cap.release()
+        if total <= 0:
+            return [(0, None)]
+        return split_segments(total, workers, self.__performance_settings['video_min_segment_frames'])
+
+    def __segment_task(self):
+        """
+        Общая часть задания для рабочего процесса.
+        """
+        return {
+            'input_path': self.input_path,
+            'performance_settings': dict(self.__performance_settings),
+            'methods_state': self.get_methods_state()
+        }
+
+    def __run_segments(self, worker_function, segments, segments_dir, segments_params=None, **task_params):
+        """
+        Запуск обработки сегментов в пуле процессов. task_params - общие параметры задания,
+        segments_params - список параметров, своих для каждого сегмента.
+        Возвращает результаты по сегментам в порядке сегментов и пути к файлам сегментов.
+        """
+        pool = self.__get_process_pool(int(self.__performance_settings['video_segment_workers']))
+        task = dict(self.__segment_task(), **task_params)
+        if segments_params is None:
+            segments_params = [{}] * len(segments)
+        paths = [os.path.join(segments_dir, f"segment_{index:04d}.mp4") for index in range(len(segments))]
+        futures = [
+            pool.submit(worker_function, dict(task, start=start, end=end, segment_path=path, **segment_params))
+            for (start, end), path, segment_params in zip(segments, paths, segments_params)
+        ]
+        return [future.result() for future in futures], paths
+
+    def __recovery_video_segments(self, processing_mode, defect_mode, segments):
+        """
+        Параллельное восстановление видео: каждый сегмент кадров обрабатывается в своем процессе
+        (со своими VideoCapture и VideoWriter), затем сегменты склеиваются по порядку,
+        а счетчики результатов суммируются.
+        """
+        # формируем необходимое название для сохранения
+        video_name = Path(self.input_path).stem
+        processed_name = f"processed_{video_name}.mp4"
+        self.processed_path = str(Path(self.output_path) / processed_name)
+
+        # временные сегменты - во временной папке системы, а не в папке результатов
+        segments_dir = tempfile.mkdtemp(prefix='segments_')
         try:
-            if defect_mode == 'often_defect':
-                often_class = self.find_often_defect_dataset()
+            segments_classes = [None] * len(segments)
+            if defect_mode == 'often_defect' and not self.__performance_settings['often_defect_sampling']:
+                # классы кадров считаются по сегментам один раз и потом передаются для исправления
+                segments_classes, _ = self.__run_segments(
+                    ParallelRecovery.classify_video_segment, segments, segments_dir)
+                if any(segment_classes is None for segment_classes in segments_classes): return None, None
+                often_class = self.__often_defect_from_classes(
+                    [predicted_class for segment_classes in segments_classes for predicted_class in segment_classes])
+            elif defect_mode == 'often_defect':
+                often_class = self.find_often_defect_video()
             else:
                 often_class = None
 
             print('OFTEN', often_class)
 
+            segments_results, paths = self.__run_segments(
+                ParallelRecovery.recover_video_segment,
+                segments,
+                segments_dir,
+                segments_params=[{'stored_classes': segment_classes} for segment_classes in segments_classes],
+                processing_mode=processing_mode,
+                defect_mode=defect_mode,
+                often_class=often_class
+            )
+
             # словарь с результатами
             main_results = {
                 'blur': [0, 0],
@@ -1355,6 +2344,78 @@ class ProcessingClass:
                 'glares': [0, 0],
                 'noise': [0, 0]
             }
+            for results in segments_results:
+                if results is None: return None, None
+                main_results = self.__merge_results(main_results, results)
+
+            if not concat_videos(paths, self.processed_path): return None, None
+
+            print('main_results', main_results)
+            return (self.processed_path, main_results)
+        finally:
+            shutil.rmtree(segments_dir, ignore_errors=True)
+
+    def classify_video_segment(self, start, end):
+        """
+        Классы кадров видео с номерами [start, end) (end = None - до конца видео).
+        """
+        cap = open_video_at(self.input_path, start)
+        if cap is None:
+            return None
+        count = None if end is None else end - start
+        predicted_classes = []
+        batch_size = self.__performance_settings['classification_batch_size']
+        for batch in self.__iter_batches(self.__read_video_frames(cap, count=count), batch_size):
+            predicted_classes.extend(prediction[0] for prediction in self.determine_classes(batch))
+        cap.release()
+        return predicted_classes
+
+    def recovery_video_segment(self, start, end, segment_path, processing_mode, defect_mode,
+                               often_class=None, stored_classes=None):
+        """
+        Восстановление кадров [start, end) видео с записью в отдельный файл segment_path.
+        Возвращает словарь с результатами по сегменту или None при ошибке.
+        """
+        cap = open_video_at(self.input_path, start)
+        if cap is None:
+            return None
+        fps = cap.get(cv2.CAP_PROP_FPS)
+        width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        fourcc = cv2.VideoWriter_fourcc(*'mp4v')
+        out = cv2.VideoWriter(segment_path, fourcc, fps, (width, height))
+        if not out.isOpened():
+            cap.release()
+            return None
+
+        count = None if end is None else end - start
+        results = self.__recover_frames(
+            self.__read_video_frames(cap, count=count), out, processing_mode, defect_mode, often_class, stored_classes)
+
+        cap.release()
+        out.release()
+        return results
+
+    def __read_spilled_frames(self, spill, cap):
+        """
+        Кадры из временного хранилища, а если поместились не все - оставшиеся кадры из видео.
+        """
+        for frame in spill:
+            yield frame
+        if spill.full:
+            yield from self.__read_video_frames(cap, skip=len(spill))
+    
+    def recovery_dataset(self, processing_mode, defect_mode):
+        """
+        Восстановление датасета.
+        В режиме 'often_defect' (если включен often_defect_single_pass) изображения
+        классифицируются один раз, см. recovery_video.
+        При dataset_workers > 1 датасет обрабатывается параллельно в нескольких процессах.
+        """
+        spill = None
+        try:
+            # получаем список имен изображений
+            images = os.listdir(self.input_path)
 
             # создаем папку для сохранения датасета по указанному пути
             input_folder_name = Path(self.input_path).name
@@ -1363,39 +2424,284 @@ class ProcessingClass:
             self.processed_path.mkdir(parents=True, exist_ok=True)
             self.processed_path = str(self.processed_path)
 
-            # получаем список имен изображений
-            images = os.listdir(self.input_path)
-            for image_name in images:
-                input_image_path = os.path.join(self.input_path, image_name)
-                output_image_path = os.path.join(self.processed_path, image_name)
+            workers = int(self.__performance_settings['dataset_workers'])
+            if workers > 1 and len(images) > 1:
+                return self.__recovery_dataset_parallel(images, processing_mode, defect_mode, workers)
+
+            # оценка по выборке дешевле полного прохода, поэтому при ней однопроходный режим не нужен
+            single_pass = (defect_mode == 'often_defect'
+                           and self.__performance_settings['often_defect_single_pass']
+                           and not self.__performance_settings['often_defect_sampling'])
+            stored_classes = None
+            if single_pass:
+                spill = FrameSpillCache(self.__performance_settings['frame_spill_limit_mb'])
+                first_pass = self.__classify_dataset_single_pass(images, spill)
+                if first_pass is None: return None, None
+                often_class, stored_classes = first_pass
+            elif defect_mode == 'often_defect':
+                often_class = self.find_often_defect_dataset()
+            else:
+                often_class = None
 
-                # загружаем изображение
-                input_image = self.__cv2_imread_unicode(input_image_path)
-                if input_image is None: return None, None
+            print('OFTEN', often_class)
+
+            main_results = self.recovery_dataset_shard(
+                images, self.processed_path, processing_mode, defect_mode, often_class, stored_classes, spill)
+            if main_results is None: return None, None
+            
+            print(self.processed_path, main_results)
+            return (self.processed_path, main_results)
+        except:
+            return None, None
+        finally:
+            if spill is not None: spill.close()
+
+    def recovery_dataset_shard(self, images, processed_path, processing_mode, defect_mode,
+                               often_class=None, stored_classes=None, spill=None):
+        """
+        Исправление списка изображений датасета с сохранением в папку processed_path.
+        stored_classes - уже известные классы изображений, spill - временное хранилище
+        с уже декодированными изображениями (начало списка).
+        Возвращает словарь с результатами или None при ошибке.
+        """
+        # словарь с результатами
+        main_results = {
+            'blur': [0, 0],
+            'contrast': [0, 0],
+            'glares': [0, 0],
+            'noise': [0, 0]
+        }
+
+        batch_size = self.__performance_settings['classification_batch_size']
+
+        input_images = self.__read_dataset_images(images, spill)
+        for start in range(0, len(images), batch_size):
+            batch_names = images[start:start + batch_size]
+
+            # загружаем пакет изображений
+            batch = [next(input_images) for _ in batch_names]
+            if any(input_image is None for input_image in batch): return None
+
+            # классифицируем весь пакет за один вызов модели (если классы еще не известны)
+            if stored_classes is not None:
+                predicted_classes = stored_classes[start:start + len(batch)]
+            else:
+                predicted_classes = [prediction[0] for prediction in self.determine_classes(batch)]
+
+            for image_name, input_image, predicted_class in zip(batch_names, batch, predicted_classes):
+                output_image_path = os.path.join(processed_path, image_name)
 
                 # обрабатываем каждое изображение
-                processed_image, results = self.recovery(input_image, processing_mode, defect_mode, often_class)
+                processed_image, results = self.recovery(
+                    input_image, processing_mode, defect_mode, often_class, predicted_class)
 
                 # обновляем словарь с результатами
-                main_results = {
-                    key: [
-                        main_results[key][0] + results[key][0], 
-                        main_results[key][1] + results[key][1]
-                    ] 
-                    for key in main_results
-                }
+                main_results = self.__merge_results(main_results, results)
 
-                # if not self.__cv2_imwrite_unicode(output_image_path, processed_image):
-                #     return None
                 if self.__cv2_imwrite_unicode(output_image_path, processed_image):
                     print('save')
                 else:
-                    return None, None
-            
-            print(self.processed_path, main_results)
-            return (self.processed_path, main_results)
-        except:
-            return None, None
+                    return None
+
+        return main_results
+
+    def classify_dataset_shard(self, images):
+        """
+        Классы изображений датасета из списка images (None, если какое-то изображение не прочиталось).
+        """
+        predicted_classes = []
+        batch_size = self.__performance_settings['classification_batch_size']
+        for batch_names in self.__iter_batches(images, batch_size):
+            batch = []
+            for image_name in batch_names:
+                input_image = self.__cv2_imread_unicode(os.path.join(self.input_path, image_name))
+                if input_image is None: return None
+                batch.append(input_image)
+            predicted_classes.extend(prediction[0] for prediction in self.determine_classes(batch))
+        return predicted_classes
+
+    def iter_recovery(self, source, processing_mode, defect_mode, save=False):
+        """
+        Потоковое восстановление изображения, видео или датасета.
+        Генератор выдает результат по каждому кадру (изображению) сразу после его обработки,
+        не дожидаясь обработки всего файла. source - путь к файлу или папке (None - текущий input_path).
+        Выдается словарь:
+        'index' - номер кадра (изображения), 'total' - их общее число (0, если неизвестно),
+        'name' - имя изображения (для кадров видео - None), 'image' - исправленное изображение (BGR),
+        'predicted_class' - класс исходного изображения, 'results' - накопленные результаты по дефектам.
+        При save=True результат записывается так же, как в recovery_image/video/dataset
+        (путь - в self.processed_path). При ошибке чтения генератор завершается.
+        """
+        if source is not None:
+            self.set_input_path(source)
+
+        if os.path.isdir(self.input_path):
+            source_type = 'dataset'
+        elif self.input_path.lower().endswith(self.VIDEO_EXTENSIONS):
+            source_type = 'video'
+        else:
+            source_type = 'image'
+
+        # самый частый дефект определяется до обработки (изображение исправляется как есть)
+        often_class = None
+        if defect_mode == 'often_defect':
+            if source_type == 'video':
+                often_class = self.find_often_defect_video()
+            elif source_type == 'dataset':
+                often_class = self.find_often_defect_dataset()
+
+        # словарь с результатами
+        main_results = {
+            'blur': [0, 0],
+            'contrast': [0, 0],
+            'glares': [0, 0],
+            'noise': [0, 0]
+        }
+
+        cap = None
+        out = None
+        try:
+            # источник изображений: пары (имя, изображение); кадры видео - в RGB
+            if source_type == 'video':
+                cap = cv2.VideoCapture(self.input_path)
+                if not cap.isOpened(): return
+                total = max(0, int(cap.get(cv2.CAP_PROP_FRAME_COUNT)))
+                items = ((None, frame) for frame in self.__read_video_frames(cap))
+                if save:
+                    video_name = Path(self.input_path).stem
+                    self.processed_path = str(Path(self.output_path) / f"processed_{video_name}.mp4")
+                    fps = cap.get(cv2.CAP_PROP_FPS)
+                    width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+                    height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+                    fourcc = cv2.VideoWriter_fourcc(*'mp4v')
+                    out = cv2.VideoWriter(self.processed_path, fourcc, fps, (width, height))
+            elif source_type == 'dataset':
+                images = os.listdir(self.input_path)
+                total = len(images)
+                items = zip(images, self.__read_dataset_images(images))
+                if save:
+                    processed_path = Path(self.output_path) / f"processed_{Path(self.input_path).name}"
+                    processed_path.mkdir(parents=True, exist_ok=True)
+                    self.processed_path = str(processed_path)
+            else:
+                total = 1
+                items = [(os.path.basename(self.input_path), self.__cv2_imread_unicode(self.input_path))]
+                if save:
+                    name, ext = os.path.splitext(os.path.basename(self.input_path))
+                    self.processed_path = os.path.join(self.output_path, f"processed_{name}{ext}")
+
+            batch_size = self.__performance_settings['classification_batch_size']
+            for start, batch in self.__enumerate_batches(items, batch_size):
+                if any(input_image is None for _, input_image in batch): return
+
+                # классифицируем весь пакет за один вызов модели
+                predictions = self.determine_classes([input_image for _, input_image in batch])
+                for offset, ((name, input_image), prediction) in enumerate(zip(batch, predictions)):
+                    processed_image, results = self.recovery(
+                        input_image, processing_mode, defect_mode, often_class, prediction[0])
+                    main_results = self.__merge_results(main_results, results)
+
+                    if source_type == 'video':
+                        # конвертируем обратно в BGR
+                        processed_image = cv2.cvtColor(processed_image, cv2.COLOR_RGB2BGR)
+                        if out is not None: out.write(processed_image)
+                    elif save:
+                        output_image_path = (os.path.join(self.processed_path, name)
+                                             if source_type == 'dataset' else self.processed_path)
+                        if not self.__cv2_imwrite_unicode(output_image_path, processed_image): return
+
+                    yield {
+                        'index': start + offset,
+                        'total': total,
+                        'name': name,
+                        'image': processed_image,
+                        'predicted_class': prediction[0],
+                        'results': {key: list(value) for key, value in main_results.items()}
+                    }
+        finally:
+            # освобождаем ресурсы (в том числе при досрочном закрытии генератора)
+            if cap is not None: cap.release()
+            if out is not None: out.release()
+
+    def __get_process_pool(self, workers):
+        """
+        Пул рабочих процессов (создается один раз и переиспользуется, пока не изменится число процессов).
+        Каждый процесс при запуске сам загружает модели.
+        """
+        pool = self.__process_pool
+        if pool is not None and self.__process_pool_workers == workers:
+            return pool
+        if pool is not None:
+            pool.shutdown()
+        self.__process_pool = ProcessPoolExecutor(
+            max_workers=workers,
+            # spawn: дочерние процессы не наследуют состояние tensorflow родителя
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=ParallelRecovery.init_worker,
+            initargs=(self.model_path, self.yolo_raw_path, self.yolo_best_path, self.output_path)
+        )
+        self.__process_pool_workers = workers
+        return self.__process_pool
+
+    def __recovery_dataset_parallel(self, images, processing_mode, defect_mode, workers):
+        """
+        Параллельное восстановление датасета: изображения делятся на части (шарды),
+        которые обрабатываются в рабочих процессах; результаты частей суммируются.
+        """
+        pool = self.__get_process_pool(workers)
+
+        # шардов больше, чем процессов, - чтобы процессы были загружены равномерно
+        shard_size = max(1, -(-len(images) // (workers * 4)))
+        shards = [images[start:start + shard_size] for start in range(0, len(images), shard_size)]
+        task = {
+            'input_path': self.input_path,
+            'performance_settings': dict(self.__performance_settings),
+            'methods_state': self.get_methods_state()
+        }
+
+        shards_classes = [None] * len(shards)
+        if defect_mode == 'often_defect' and not self.__performance_settings['often_defect_sampling']:
+            # классы считаются в рабочих процессах один раз и потом передаются для исправления
+            futures = [pool.submit(ParallelRecovery.classify_dataset_shard, dict(task, image_names=shard))
+                       for shard in shards]
+            shards_classes = [future.result() for future in futures]
+            if any(shard_classes is None for shard_classes in shards_classes): return None, None
+            often_class = self.__often_defect_from_classes(
+                [predicted_class for shard_classes in shards_classes for predicted_class in shard_classes])
+        elif defect_mode == 'often_defect':
+            often_class = self.find_often_defect_dataset()
+        else:
+            often_class = None
+
+        print('OFTEN', often_class)
+
+        futures = [
+            pool.submit(ParallelRecovery.recover_dataset_shard, dict(
+                task,
+                image_names=shard,
+                processed_path=self.processed_path,
+                processing_mode=processing_mode,
+                defect_mode=defect_mode,
+                often_class=often_class,
+                stored_classes=shard_classes
+            ))
+            for shard, shard_classes in zip(shards, shards_classes)
+        ]
+
+        # словарь с результатами
+        main_results = {
+            'blur': [0, 0],
+            'contrast': [0, 0],
+            'glares': [0, 0],
+            'noise': [0, 0]
+        }
+        for future in futures:
+            results = future.result()
+            if results is None: return None, None
+            main_results = self.__merge_results(main_results, results)
+
+        print(self.processed_path, main_results)
+        return (self.processed_path, main_results)
         
     
     # ================================================================================
@@ -1404,6 +2710,13 @@ class ProcessingClass:
 
     def detect_objects(self, image, detect_type, confidence_threshold):
         print('detect_objects')
+        return self.detect_objects_batch([image], detect_type, confidence_threshold)[0]
+
+    def detect_objects_batch(self, images, detect_type, confidence_threshold):
+        """
+        Пакетное распознавание: один вызов модели на весь список изображений,
+        затем на каждом изображении рисуются найденные объекты.
+        """
         if detect_type == 'raw':
             model = self.yolo_raw_model
         elif detect_type == 'best':
@@ -1411,8 +2724,17 @@ class ProcessingClass:
 
         print(11)
 
+        results = model(list(images), verbose=False)
+        return [
+            self.__draw_detections(image, result, model, confidence_threshold)
+            for image, result in zip(images, results)
+        ]
+
+    def __draw_detections(self, image, result, model, confidence_threshold):
+        """
+        Рисует рамки и подписи объектов одного результата модели на копии изображения.
+        """
         result_image = image.copy()
-        results = model(image)
         class_colors = [
             (255, 0, 0),    # Красный (класс 0)
             (0, 255, 255),    # Зеленый (класс 1)
@@ -1428,42 +2750,41 @@ class ProcessingClass:
             (0, 128, 128)   # Бирюзовый (класс 11)
         ]
 
-        for result in results:
-            print(12)
-            boxes = result.boxes
-            for box in boxes:
-                print(13)
-                x1, y1, x2, y2 = box.xyxy[0].tolist()
+        print(12)
+        boxes = result.boxes
+        for box in boxes:
+            print(13)
+            x1, y1, x2, y2 = box.xyxy[0].tolist()
+            
+            confidence = box.conf[0].item()
+            class_id = box.cls[0].item()
+            class_name = model.names[int(class_id)]
+            print(14)
+
+            if confidence >= confidence_threshold:
+                # рисуем прямоугольник
+                x1, y1, x2, y2 = int(x1), int(y1), int(x2), int(y2)
+                color = class_colors[int(class_id)]
+                thickness = 1
+                cv2.rectangle(result_image, (x1, y1), (x2, y2), color, thickness)
                 
-                confidence = box.conf[0].item()
-                class_id = box.cls[0].item()
-                class_name = model.names[int(class_id)]
-                print(14)
-
-                if confidence >= confidence_threshold:
-                    # рисуем прямоугольник
-                    x1, y1, x2, y2 = int(x1), int(y1), int(x2), int(y2)
-                    color = class_colors[int(class_id)]
-                    thickness = 1
-                    cv2.rectangle(result_image, (x1, y1), (x2, y2), color, thickness)
-                    
-                    # создаем подпись
-                    label = f"{class_name}: {confidence:.2f}"
-                    
-                    # устанавливаем шрифт
-                    font = cv2.FONT_HERSHEY_SIMPLEX
-                    font_scale = 0.3
-                    text_thickness = 1
-                    (text_width, text_height), _ = cv2.getTextSize(label, font, font_scale, text_thickness)
-                    
-                    # рисуем подложку для текста
-                    cv2.rectangle(result_image, (x1, y1 - text_height - 10), (x1 + text_width, y1), color, -1)
-                    
-                    # рисуем текст
-                    cv2.putText(result_image, label, (x1, y1 - 5), font, font_scale, (0, 0, 0), text_thickness)
-
-                    print(15)        
-        
+                # создаем подпись
+                label = f"{class_name}: {confidence:.2f}"
+                
+                # устанавливаем шрифт
+                font = cv2.FONT_HERSHEY_SIMPLEX
+                font_scale = 0.3
+                text_thickness = 1
+                (text_width, text_height), _ = cv2.getTextSize(label, font, font_scale, text_thickness)
+                
+                # рисуем подложку для текста
+                cv2.rectangle(result_image, (x1, y1 - text_height - 10), (x1 + text_width, y1), color, -1)
+                
+                # рисуем текст
+                cv2.putText(result_image, label, (x1, y1 - 5), font, font_scale, (0, 0, 0), text_thickness)
+
+                print(15)        
+    
         return result_image
     
     def detect_image(self, detect_type, confidence_threshold=0.55):
@@ -1507,6 +2828,7 @@ class ProcessingClass:
         """
         Нахождение объектов на видео.
         detect_type - тип видео (модели): исходный или обработанный (raw, best).
+        При video_segment_workers > 1 сегменты видео размечаются параллельно в нескольких процессах.
         """
         try:
             print(1)
@@ -1521,9 +2843,15 @@ class ProcessingClass:
             print(2)
             # определяем, какое видео нужно размечать: исходное или исправленное
             if detect_type == 'raw':
-                cap = cv2.VideoCapture(self.input_path)
+                source_path = self.input_path
             elif detect_type == 'best':
-                cap = cv2.VideoCapture(self.processed_path)
+                source_path = self.processed_path
+
+            segments = self.__video_segments(source_path)
+            if len(segments) > 1:
+                return self.__detect_video_segments(detect_type, source_path, detected_path, segments, confidence_threshold)
+
+            cap = cv2.VideoCapture(source_path)
             if not cap.isOpened(): return None
             
             print(3)
@@ -1539,21 +2867,7 @@ class ProcessingClass:
             
             print(5)
             # обрабатываем каждый кадр
-            while True:
-                print(6)
-                ret, frame = cap.read()
-                if not ret:
-                    break
-                
-                # конвертируем BGR (OpenCV) в RGB (для методов обработки)
-                rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                
-                # распознаем объекты
-                detected_frame = self.detect_objects(image=rgb_frame, detect_type=detect_type, confidence_threshold=confidence_threshold)
-                
-                # конвертируем обратно в BGR для сохранения
-                bgr_frame = cv2.cvtColor(detected_frame, cv2.COLOR_RGB2BGR)
-                out.write(bgr_frame)
+            self.__detect_frames(self.__read_video_frames(cap), out, detect_type, confidence_threshold)
             
             print(7)
             # освобождаем ресурсы
@@ -1565,6 +2879,75 @@ class ProcessingClass:
         
         except Exception as e:
             return None
+
+    def __detect_frames(self, frames, out, detect_type, confidence_threshold):
+        """
+        Разметка последовательности RGB-кадров с записью в out (cv2.VideoWriter).
+        Кадры передаются в модель пакетами по detection_batch_size.
+        """
+        batch_size = self.__performance_settings['detection_batch_size']
+        for batch in self.__iter_batches(frames, batch_size):
+            print(6)
+            # распознаем объекты
+            detected_frames = self.detect_objects_batch(batch, detect_type=detect_type, confidence_threshold=confidence_threshold)
+            
+            for detected_frame in detected_frames:
+                # конвертируем обратно в BGR для сохранения
+                bgr_frame = cv2.cvtColor(detected_frame, cv2.COLOR_RGB2BGR)
+                out.write(bgr_frame)
+
+    def __detect_video_segments(self, detect_type, source_path, detected_path, segments, confidence_threshold):
+        """
+        Параллельная разметка видео по сегментам с последующей склейкой.
+        """
+        # экспорт модели в выбранный формат (если нужен) выполняется один раз здесь, а не в каждом процессе
+        if self.__performance_settings['detection_backend'] != 'pt':
+            try:
+                export_yolo(self.yolo_raw_path if detect_type == 'raw' else self.yolo_best_path,
+                            self.__performance_settings['detection_backend'])
+            except Exception as e:
+                print('export_yolo', e)
+
+        # временные сегменты - во временной папке системы, а не в папке результатов
+        segments_dir = tempfile.mkdtemp(prefix='segments_')
+        try:
+            segments_results, paths = self.__run_segments(
+                ParallelRecovery.detect_video_segment,
+                segments,
+                segments_dir,
+                source_path=str(source_path),
+                detect_type=detect_type,
+                confidence_threshold=confidence_threshold
+            )
+            if not all(segments_results): return None
+            if not concat_videos(paths, detected_path): return None
+            return detected_path
+        finally:
+            shutil.rmtree(segments_dir, ignore_errors=True)
+
+    def detect_video_segment(self, source_path, start, end, segment_path, detect_type, confidence_threshold=0.55):
+        """
+        Разметка кадров [start, end) видео source_path с записью в отдельный файл segment_path.
+        Возвращает False, если видео или файл сегмента не удалось открыть.
+        """
+        cap = open_video_at(source_path, start)
+        if cap is None:
+            return False
+        fps = cap.get(cv2.CAP_PROP_FPS)
+        width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        fourcc = cv2.VideoWriter_fourcc(*'mp4v')
+        out = cv2.VideoWriter(segment_path, fourcc, fps, (width, height))
+        if not out.isOpened():
+            cap.release()
+            return False
+
+        count = None if end is None else end - start
+        self.__detect_frames(self.__read_video_frames(cap, count=count), out, detect_type, confidence_threshold)
+
+        cap.release()
+        out.release()
+        return True
         
     def detect_dataset(self, detect_type, confidence_threshold=0.55):
         """
@@ -1584,23 +2967,129 @@ class ProcessingClass:
             detected_path.mkdir(parents=True, exist_ok=True)
             detected_path = str(detected_path)
 
+            batch_size = self.__performance_settings['detection_batch_size']
+
             # получаем список имен изображений
             images = os.listdir(input_folder_path)
-            for image_name in images:
-                input_image_path = os.path.join(input_folder_path, image_name)
-                output_image_path = os.path.join(detected_path, image_name)
-
-                # загружаем изображение
-                input_image = self.__cv2_imread_unicode(input_image_path)
-                if input_image is None: return None
-
-                # распознаем объекты
-                detected_image = self.detect_objects(image=input_image, detect_type=detect_type, confidence_threshold=confidence_threshold)
-
-                if not self.__cv2_imwrite_unicode(output_image_path, detected_image):
-                    return None
+            for batch_names in self.__iter_batches(images, batch_size):
+                # загружаем пакет изображений
+                batch = []
+                for image_name in batch_names:
+                    input_image = self.__cv2_imread_unicode(os.path.join(input_folder_path, image_name))
+                    if input_image is None: return None
+                    batch.append(input_image)
+
+                # распознаем объекты на всем пакете
+                detected_images = self.detect_objects_batch(batch, detect_type=detect_type, confidence_threshold=confidence_threshold)
+
+                for image_name, detected_image in zip(batch_names, detected_images):
+                    output_image_path = os.path.join(detected_path, image_name)
+                    if not self.__cv2_imwrite_unicode(output_image_path, detected_image):
+                        return None
             
             return detected_path
         except:
             return None
-    
\ No newline at end of file
+    
+    def detect_image_pair(self, confidence_threshold=0.55):
+        """
+        Разметка исходного и исправленного изображений одновременно (в двух потоках, каждая
+        модель - в своем). Возвращает (путь к размеченному исходному, путь к размеченному исправленному).
+        """
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            raw_future = executor.submit(self.detect_image, 'raw', confidence_threshold)
+            best_future = executor.submit(self.detect_image, 'best', confidence_threshold)
+            return raw_future.result(), best_future.result()
+
+    def detect_dataset_pair(self, confidence_threshold=0.55):
+        """
+        Разметка исходного и исправленного датасетов одновременно (см. detect_image_pair).
+        """
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            raw_future = executor.submit(self.detect_dataset, 'raw', confidence_threshold)
+            best_future = executor.submit(self.detect_dataset, 'best', confidence_threshold)
+            return raw_future.result(), best_future.result()
+
+    def detect_video_pair(self, confidence_threshold=0.55):
+        """
+        Разметка исходного и исправленного видео за один проход: видео читаются синхронно
+        пакетами кадров, пакеты размечаются моделями yolo_raw_model и yolo_best_model одновременно
+        в двух потоках, результаты пишутся в два файла.
+        Видео размечаются независимо: ошибка при разметке одного не прерывает разметку другого.
+        Возвращает (путь к размеченному исходному, путь к размеченному исправленному),
+        None вместо пути - для видео, которое разметить не удалось.
+        """
+        # при делении на сегменты каждое видео и так размечается всеми процессами
+        if len(self.__video_segments()) > 1:
+            return self.detect_video('raw', confidence_threshold), self.detect_video('best', confidence_threshold)
+
+        # формируем необходимые названия для сохранения
+        video_name = Path(self.input_path).stem
+        detected_paths = {
+            'raw': str(Path(self.output_path) / f"detected_{video_name}.mp4"),
+            'best': str(Path(self.output_path) / f"detected_processed_{video_name}.mp4")
+        }
+        source_paths = {
+            'raw': self.input_path,
+            'best': self.processed_path
+        }
+        results = dict.fromkeys(source_paths)
+
+        caps = {}
+        outs = {}
+        try:
+            # открываем оба видео и создаем VideoWriter для каждого
+            # (видео, которое не удалось открыть, пропускается)
+            fourcc = cv2.VideoWriter_fourcc(*'mp4v')
+            for detect_type, source_path in source_paths.items():
+                try:
+                    caps[detect_type] = cv2.VideoCapture(source_path)
+                    if not caps[detect_type].isOpened(): continue
+                    fps = caps[detect_type].get(cv2.CAP_PROP_FPS)
+                    width = int(caps[detect_type].get(cv2.CAP_PROP_FRAME_WIDTH))
+                    height = int(caps[detect_type].get(cv2.CAP_PROP_FRAME_HEIGHT))
+                    outs[detect_type] = cv2.VideoWriter(detected_paths[detect_type], fourcc, fps, (width, height))
+                    if not outs[detect_type].isOpened(): continue
+                    results[detect_type] = detected_paths[detect_type]
+                except Exception as e:
+                    print('detect_video_pair', detect_type, e)
+
+            batch_size = self.__performance_settings['detection_batch_size']
+            batches = {
+                detect_type: self.__iter_batches(self.__read_video_frames(caps[detect_type]), batch_size)
+                for detect_type in source_paths if results[detect_type] is not None
+            }
+
+            def detect_next_batch(detect_type):
+                # чтение следующего пакета, разметка и перевод в BGR - в потоке своей модели
+                batch = next(batches[detect_type], None)
+                if batch is None:
+                    return None
+                detected_frames = self.detect_objects_batch(batch, detect_type, confidence_threshold)
+                return [cv2.cvtColor(detected_frame, cv2.COLOR_RGB2BGR) for detected_frame in detected_frames]
+
+            active = list(batches)
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                while active:
+                    futures = {detect_type: executor.submit(detect_next_batch, detect_type) for detect_type in active}
+                    for detect_type, future in futures.items():
+                        try:
+                            bgr_frames = future.result()
+                            if bgr_frames is None:
+                                active.remove(detect_type)
+                                continue
+                            for bgr_frame in bgr_frames:
+                                outs[detect_type].write(bgr_frame)
+                        except Exception as e:
+                            # ошибка разметки одного видео: другое размечается дальше
+                            print('detect_video_pair', detect_type, e)
+                            results[detect_type] = None
+                            active.remove(detect_type)
+
+            return results['raw'], results['best']
+        finally:
+            # освобождаем ресурсы
+            for cap in caps.values():
+                cap.release()
+            for out in outs.values():
+                out.release()
@@ -0,0 +1,133 @@
+import threading
+
+import numpy as np
+
+from backend.ImageMetrics import to_gray, laplacian_variance, histogram_spread, saturated_fraction, noise_sigma
+
+class QualityPrefilter:
+    """
+    Быстрая предварительная проверка качества перед классификатором.
+    По четырем простым метрикам (резкость, контраст, блики, шум) изображение признается
+    заведомо чистым - тогда классификатор можно не вызывать - или помечается как кандидат
+    на дефекты, метрики которых вышли за пороги.
+    Пороги подбираются по предсказаниям классификатора (calibrate); без порогов
+    предварительная проверка ничего не пропускает.
+    Считает статистику согласия с классификатором (get_stats).
+    """
+
+    # метрики и направление порога: 'min' - чистое изображение не ниже порога, 'max' - не выше
+    METRICS = {
+        'blur': 'min',
+        'contrast': 'min',
+        'glares': 'max',
+        'noise': 'max'
+    }
+
+    def __init__(self, thresholds=None):
+        self.thresholds = thresholds
+        self.__lock = threading.Lock()
+        self.reset_stats()
+
+    def measure(self, image):
+        """
+        Метрики изображения (BGR или оттенки серого).
+        """
+        gray = to_gray(image)
+        return {
+            'blur': laplacian_variance(gray),
+            'contrast': histogram_spread(gray),
+            'glares': saturated_fraction(gray),
+            'noise': noise_sigma(gray)
+        }
+
+    def check(self, metrics):
+        """
+        Список дефектов-кандидатов (метрик, вышедших за пороги); пустой список - изображение чистое.
+        None, если пороги не заданы.
+        """
+        if not self.thresholds:
+            return None
+        candidates = []
+        for name, direction in self.METRICS.items():
+            threshold = self.thresholds.get(name)
+            if threshold is None:
+                continue
+            if (direction == 'min' and metrics[name] < threshold) or (direction == 'max' and metrics[name] > threshold):
+                candidates.append(name)
+        return candidates
+
+    def record(self, candidates, predicted_class=None):
+        """
+        Учет результата проверки. predicted_class - класс по классификатору
+        (None, если классификатор не вызывался, т.е. изображение пропущено как чистое).
+        """
+        with self.__lock:
+            stats = self.__stats
+            stats['checked'] += 1
+            clean = candidates is not None and not candidates
+            if clean: stats['clean'] += 1
+            if predicted_class is None:
+                stats['skipped'] += 1
+                return
+            stats['verified'] += 1
+            if clean == (predicted_class == 'good'): stats['agreed'] += 1
+            if clean and predicted_class != 'good': stats['missed_defects'] += 1
+            if candidates and predicted_class in candidates: stats['candidate_hits'] += 1
+
+    def get_stats(self):
+        """
+        Статистика: checked - проверено, clean - признано чистыми, skipped - пропущено без классификатора,
+        verified - сверено с классификатором, agreed - совпало (чистое <-> 'good'),
+        missed_defects - признано чистыми, но классификатор нашел дефект,
+        candidate_hits - класс классификатора оказался среди кандидатов; и доли agreement, skip_rate.
+        """
+        with self.__lock:
+            stats = dict(self.__stats)
+        stats['agreement'] = stats['agreed'] / stats['verified'] if stats['verified'] else None
+        stats['skip_rate'] = stats['skipped'] / stats['checked'] if stats['checked'] else None
+        return stats
+
+    def reset_stats(self):
+        with self.__lock:
+            self.__stats = {
+                'checked': 0,
+                'clean': 0,
+                'skipped': 0,
+                'verified': 0,
+                'agreed': 0,
+                'missed_defects': 0,
+                'candidate_hits': 0
+            }
+
+    @classmethod
+    def calibrate(cls, metrics, predicted_classes, target_precision=0.99):
+        """
+        Подбор порогов по метрикам изображений и их классам по классификатору.
+        Пороги берутся квантилями метрик изображений класса 'good' и ужесточаются до тех пор,
+        пока среди признанных чистыми доля 'good' не станет не меньше target_precision.
+        Возвращает (пороги или None, если подобрать не удалось; доля признанных чистыми; точность).
+        """
+        good = [m for m, predicted_class in zip(metrics, predicted_classes) if predicted_class == 'good']
+        if not good:
+            return None, 0.0, None
+        is_good = np.array([predicted_class == 'good' for predicted_class in predicted_classes])
+        values = {name: np.array([m[name] for m in metrics], dtype=np.float64) for name in cls.METRICS}
+        good_values = {name: np.array([m[name] for m in good], dtype=np.float64) for name in cls.METRICS}
+
+        # q - доля изображений 'good', отсекаемая каждым порогом (чем больше, тем строже)
+        for q in np.arange(0.05, 1.0, 0.05):
+            thresholds = {}
+            clean = np.ones(len(metrics), dtype=bool)
+            for name, direction in cls.METRICS.items():
+                if direction == 'min':
+                    thresholds[name] = float(np.quantile(good_values[name], q))
+                    clean &= values[name] >= thresholds[name]
+                else:
+                    thresholds[name] = float(np.quantile(good_values[name], 1 - q))
+                    clean &= values[name] <= thresholds[name]
+            if not clean.any():
+                break
+            precision = float(is_good[clean].mean())
+            if precision >= target_precision:
+                return thresholds, float(clean.mean()), precision
+        return None, 0.0, None
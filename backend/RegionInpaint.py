@@ -0,0 +1,54 @@
+"""
+Восстановление (inpaint) только в окрестностях областей маски.
+"""
+import cv2
+import numpy as np
+
+# размер блока, по которому ищутся области маски (поиск связных областей на полном кадре дорогой)
+BLOCK_SIZE = 8
+
+def inpaint_regions(image, mask, inpaint_radius, flags, max_coverage=0.3):
+    """
+    Аналог cv2.inpaint(image, mask, inpaint_radius, flags), который обрабатывает не весь кадр,
+    а только прямоугольники вокруг связных областей маски.
+    Области ищутся на уменьшенной в BLOCK_SIZE раз карте блоков: блок отмечен, если в нем
+    или в пределах inpaint_radius + 2 пикселей от него есть пиксель маски. Поэтому близкие области
+    сливаются в одну (их восстановление влияет друг на друга), а прямоугольник каждой области
+    включает окрестность, из которой берутся значения для заполнения.
+    Каждая область восстанавливается в своем прямоугольнике по своей части маски,
+    в результат переносятся только ее пиксели.
+    Если прямоугольники покрывают больше max_coverage площади кадра, восстанавливается весь кадр.
+    """
+    if cv2.countNonZero(mask) == 0:
+        return image.copy()
+
+    height, width = mask.shape[:2]
+    padding = int(inpaint_radius) + 2
+    block = BLOCK_SIZE
+
+    # максимум по блоку, расширенному на padding: расширение с ядром, смещенным так,
+    # что левый верхний пиксель блока получает максимум по всему блоку с окрестностью
+    kernel = np.ones((block + 2 * padding, block + 2 * padding), dtype=np.uint8)
+    blocks = cv2.dilate(mask, kernel, anchor=(padding, padding))[::block, ::block]
+    count, labels, stats, _ = cv2.connectedComponentsWithStats(blocks, connectivity=8)
+
+    boxes_area = int((stats[1:, cv2.CC_STAT_WIDTH].astype(int) * stats[1:, cv2.CC_STAT_HEIGHT]).sum()) * block * block
+    if boxes_area > max_coverage * height * width:
+        return cv2.inpaint(image, mask, inpaintRadius=inpaint_radius, flags=flags)
+
+    result = image.copy()
+    for label in range(1, count):
+        bx, by, bw, bh = stats[label, :4]
+        roi = (slice(by * block, min(height, (by + bh) * block)), slice(bx * block, min(width, (bx + bw) * block)))
+
+        # в прямоугольник могут попасть пиксели соседних областей - они не восстанавливаются здесь
+        region_mask = mask[roi].copy()
+        region_labels = np.repeat(np.repeat(labels[by:by + bh, bx:bx + bw], block, axis=0), block, axis=1)
+        region_mask[region_labels[:region_mask.shape[0], :region_mask.shape[1]] != label] = 0
+        region = region_mask > 0
+        if not region.any():
+            continue
+
+        inpainted = cv2.inpaint(image[roi], region_mask, inpaintRadius=inpaint_radius, flags=flags)
+        result[roi][region] = inpainted[region]
+    return result
@@ -0,0 +1,74 @@
+import cv2
+import numpy as np
+
+from backend.ImageMetrics import thumbnail as frame_thumbnail
+
+def equalization_lut(channel):
+    """
+    Таблица преобразования (256 значений float) гистограммного выравнивания канала,
+    та же, что строит cv2.equalizeHist.
+    """
+    hist = cv2.calcHist([channel], [0], None, [256], [0, 256]).ravel()
+    first = int(np.flatnonzero(hist)[0])
+    total = hist.sum()
+    if hist[first] == total:
+        return np.full(256, first, dtype=np.float64)
+    # в float32, как в OpenCV (иначе округление половинных значений может отличаться)
+    lut = (np.cumsum(hist, dtype=np.float32) - hist[first]) * np.float32(255.0 / (total - hist[first]))
+    lut[:first] = 0
+    return lut.astype(np.float64)
+
+class TemporalEqualizer:
+    """
+    Гистограммное выравнивание кадров видео по общей таблице преобразования (LUT).
+    Таблица пересчитывается по гистограмме кадра раз в interval кадров и сглаживается
+    с прежней (доля новой - alpha), поэтому яркость результата не мерцает от кадра к кадру,
+    а на остальных кадрах выполняется только cv2.LUT. При смене сцены таблица пересчитывается
+    сразу и без сглаживания. Смена сцены - медиана отличия уменьшенной копии кадра от копии
+    при последнем пересчете больше scene_threshold, т.е. изменилось больше половины кадра
+    (появление в кадре яркого объекта сменой сцены не считается).
+    Кадры должны обрабатываться по порядку в одном потоке.
+    """
+
+    def __init__(self, interval=10, alpha=0.3, scene_threshold=20.0):
+        self.interval = interval
+        self.alpha = alpha
+        self.scene_threshold = scene_threshold
+        self.reset()
+
+    def reset(self):
+        # состояние по каждому пространству выравнивания: {ключ: {...}}
+        self.__states = {}
+        self.stats = {
+            'frames': 0,
+            'updates': 0,
+            'scene_changes': 0
+        }
+
+    def apply(self, channel, key=None):
+        """
+        Выравнивание канала яркости channel (uint8) очередного кадра.
+        key - пространство, в котором взят канал (у разных пространств свои таблицы).
+        """
+        self.stats['frames'] += 1
+        thumbnail = frame_thumbnail(channel)
+        state = self.__states.get(key)
+
+        scene_change = (state is None or state['thumbnail'].shape != thumbnail.shape
+                        or float(np.median(np.abs(thumbnail - state['thumbnail']))) > self.scene_threshold)
+        if scene_change or state['age'] >= self.interval:
+            lut = equalization_lut(channel)
+            if scene_change:
+                self.stats['scene_changes'] += 1
+            else:
+                lut = self.alpha * lut + (1 - self.alpha) * state['lut']
+            state = self.__states[key] = {
+                'lut': lut,
+                'table': np.clip(np.rint(lut), 0, 255).astype(np.uint8),
+                'thumbnail': thumbnail,
+                'age': 0
+            }
+            self.stats['updates'] += 1
+
+        state['age'] += 1
+        return cv2.LUT(channel, state['table'])
@@ -0,0 +1,98 @@
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+class VideoPipeline:
+    """
+    Конвейер из трех стадий: чтение -> обработка -> запись.
+    Чтение и запись выполняются в отдельных потоках (декодирование и кодирование OpenCV
+    отпускают GIL), обработка - в пуле из workers потоков. Порядок элементов на выходе
+    совпадает с порядком на входе. Очереди между стадиями ограничены queue_size элементами,
+    поэтому быстрая стадия ждет медленную, и память не растет.
+    """
+
+    __END = object()
+
+    def __init__(self, workers=1, queue_size=2):
+        self.workers = max(1, int(workers))
+        self.queue_size = max(1, int(queue_size))
+
+    def run(self, items, process, write):
+        """
+        items - итерируемый источник (перебирается в потоке чтения);
+        process(item) - обработка элемента (в пуле потоков);
+        write(result) - запись результата (в потоке записи, в исходном порядке).
+        Первое исключение любой стадии останавливает конвейер и пробрасывается отсюда.
+        """
+        stop = threading.Event()
+        errors = []
+        input_queue = queue.Queue(maxsize=self.queue_size)
+        # в очередь результатов кладутся future в порядке поступления - так восстанавливается порядок
+        output_queue = queue.Queue(maxsize=self.queue_size)
+
+        def fail(error):
+            errors.append(error)
+            stop.set()
+
+        def read():
+            try:
+                for item in items:
+                    if not self.__put(input_queue, item, stop):
+                        return
+            except Exception as e:
+                fail(e)
+            finally:
+                self.__put(input_queue, self.__END, stop)
+
+        def write_results():
+            try:
+                while True:
+                    future = self.__get(output_queue, stop)
+                    if future is self.__END or future is None:
+                        return
+                    write(future.result())
+            except Exception as e:
+                fail(e)
+
+        reader = threading.Thread(target=read, daemon=True)
+        writer = threading.Thread(target=write_results, daemon=True)
+        reader.start()
+        writer.start()
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            try:
+                while True:
+                    item = self.__get(input_queue, stop)
+                    if item is self.__END or item is None:
+                        break
+                    if not self.__put(output_queue, executor.submit(process, item), stop):
+                        break
+            except Exception as e:
+                fail(e)
+            finally:
+                self.__put(output_queue, self.__END, stop)
+
+        reader.join()
+        writer.join()
+        if errors:
+            raise errors[0]
+
+    @staticmethod
+    def __put(target_queue, item, stop):
+        # ожидание места в очереди с проверкой флага остановки (чтобы не зависнуть при ошибке)
+        while not stop.is_set():
+            try:
+                target_queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    @staticmethod
+    def __get(source_queue, stop):
+        while not stop.is_set():
+            try:
+                return source_queue.get(timeout=0.1)
+            except queue.Empty:
+                pass
+        return None
@@ -0,0 +1,73 @@
+"""
+Разбиение видео на сегменты по номерам кадров и склейка обработанных сегментов.
+"""
+import os
+import shutil
+import subprocess
+import tempfile
+
+import cv2
+
+def split_segments(total_frames, workers, min_segment_frames):
+    """
+    Разбивает [0, total_frames) на не более чем workers сегментов длиной не меньше min_segment_frames.
+    Возвращает список (start, end); у последнего сегмента end = None - он читается до конца видео
+    (число кадров из свойств контейнера бывает неточным).
+    """
+    count = max(1, min(int(workers), total_frames // max(1, int(min_segment_frames))))
+    # кадры делятся поровну (длины отличаются не больше чем на один кадр),
+    # поэтому и последний сегмент не короче min_segment_frames
+    starts = [total_frames * index // count for index in range(count)]
+    return list(zip(starts, starts[1:] + [None]))
+
+def open_video_at(path, start):
+    """
+    Открывает видео и устанавливает позицию на кадр start.
+    Если перемотка неточная, кадры до start пропускаются последовательно.
+    """
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        return None
+    if start > 0:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, start)
+        if int(cap.get(cv2.CAP_PROP_POS_FRAMES)) != start:
+            cap.release()
+            cap = cv2.VideoCapture(path)
+            for _ in range(start):
+                if not cap.grab(): break
+    return cap
+
+def can_concat():
+    """
+    Можно ли склеить сегменты без перекодирования (нужен ffmpeg в PATH).
+    Без этого видео на сегменты не делится: склейка с повторным сжатием
+    ухудшила бы качество и заняла бы почти столько же, сколько сэкономили процессы.
+    """
+    return shutil.which('ffmpeg') is not None
+
+def concat_videos(paths, output_path):
+    """
+    Склейка сегментов по порядку в один файл без перекодирования (ffmpeg concat, -c copy).
+    Возвращает False, если ffmpeg недоступен или завершился с ошибкой.
+    """
+    ffmpeg = shutil.which('ffmpeg')
+    if ffmpeg is None:
+        return False
+
+    # список файлов для concat-демультиплексора ffmpeg
+    with tempfile.NamedTemporaryFile('w', suffix='.txt', delete=False, encoding='utf-8') as list_file:
+        for path in paths:
+            escaped_path = os.path.abspath(path).replace("'", "'\\''")
+            list_file.write(f"file '{escaped_path}'\n")
+        list_path = list_file.name
+    try:
+        completed = subprocess.run(
+            [ffmpeg, '-y', '-v', 'error', '-f', 'concat', '-safe', '0', '-i', list_path, '-c', 'copy', output_path],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL
+        )
+        return completed.returncode == 0
+    except OSError:
+        return False
+    finally:
+        os.unlink(list_path)
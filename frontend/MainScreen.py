@@ -51,6 +51,8 @@ class ProcessingWorker(QThread):
 
     def run(self):
         try:
+            # для исправления нужен только классификатор - дожидаемся его прогрева
+            self.processor.wait_ready(names=['model'])
             if self.settings['file_type'] == 'Обработка изображения':
                 if self.settings['process_type'] == 'Автоматическая обработка':
                     if self.settings['defects_type'] == 'Исправить основной дефект':
@@ -151,15 +153,15 @@ class DetectingWorker(QThread):
 
     def run(self):
         try:
+            # дожидаемся окончания фонового прогрева моделей распознавания объектов
+            self.processor.wait_ready(names=['yolo_raw_model', 'yolo_best_model'])
+            # исходный и исправленный файлы размечаются одновременно
             if self.settings['file_type'] == 'Обработка изображения':
-                detected_path = self.processor.detect_image(detect_type='raw')
-                detected_processed_path = self.processor.detect_image(detect_type='best')
+                detected_path, detected_processed_path = self.processor.detect_image_pair()
             elif self.settings['file_type'] == 'Обработка видео':
-                detected_path = self.processor.detect_video(detect_type='raw')
-                detected_processed_path = self.processor.detect_video(detect_type='best')
+                detected_path, detected_processed_path = self.processor.detect_video_pair()
             elif self.settings['file_type'] == 'Обработка датасета':
-                detected_path = self.processor.detect_dataset(detect_type='raw')
-                detected_processed_path = self.processor.detect_dataset(detect_type='best')
+                detected_path, detected_processed_path = self.processor.detect_dataset_pair()
             
             print(f"[DEBUG] Emitting finished: {detected_path, detected_processed_path}")
             self.finished.emit(detected_path, detected_processed_path)
@@ -249,6 +251,8 @@ class MainScreen(QMainWindow):
             yolo_best_path=YOLO_BEST_PATH,
             output_path=OUTPUT_PATH
         )
+        # модели загружаются и прогреваются в фоне, пока окно уже отображается
+        self.processor.warmup_async()
         # получаем словари методов и разрешенных параметров
         self.auto_methods = self.processor.get_auto_methods()
         self.manual_methods = self.processor.get_manual_methods()
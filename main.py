@@ -1,6 +1,7 @@
 from PyQt5.QtWidgets import QApplication
 import sys
 import os
+import multiprocessing
 
 plugins_path = os.path.join(sys.prefix, 'Lib', 'site-packages', 'PyQt5', 'Qt5', 'plugins')
 os.environ['QT_PLUGIN_PATH'] = plugins_path
@@ -11,6 +12,8 @@ sys.path.append('./frontend')
 from frontend.MainScreen import MainScreen
 
 if __name__ == "__main__":
+    # нужно для процессов параллельной обработки в собранном exe
+    multiprocessing.freeze_support()
     App = QApplication(sys.argv)
     window = MainScreen()
     # App.aboutToQuit.connect(window.clear_temp_folder)
@@ -0,0 +1,61 @@
+import numpy as np
+
+from backend.ClassificationCache import ClassificationCache
+
+def image(value):
+    return np.full((224, 224, 3), value, dtype=np.uint8)
+
+def entry_size(cache):
+    cache.put(ClassificationCache.make_key(image(255)), ['good', np.float32(0.5)])
+    size = cache.get_stats()['memory']
+    cache.clear()
+    return size
+
+def test_key_depends_on_pixels_shape_and_dtype():
+    key = ClassificationCache.make_key(image(1))
+    assert key == ClassificationCache.make_key(image(1))
+    assert key != ClassificationCache.make_key(image(2))
+    assert key != ClassificationCache.make_key(image(1).reshape(224, 672))
+    assert key != ClassificationCache.make_key(image(1).astype(np.int8))
+
+def test_least_recently_used_entry_is_evicted():
+    cache = ClassificationCache()
+    size = entry_size(cache)
+    # место под три элемента (но не под четыре)
+    cache.set_max_memory(3.5 * size / (1024 * 1024))
+    keys = [ClassificationCache.make_key(image(value)) for value in range(4)]
+    for key in keys[:3]:
+        cache.put(key, ['good', np.float32(0.5)])
+    # после обращения к первому элементу самым давно использованным становится второй
+    assert cache.get(keys[0]) == ['good', np.float32(0.5)]
+    cache.put(keys[3], ['blur', np.float32(0.7)])
+
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]) is not None
+    assert cache.get(keys[2]) is not None
+    assert cache.get(keys[3]) == ['blur', np.float32(0.7)]
+    assert cache.get_stats()['entries'] == 3
+
+def test_memory_stays_within_limit():
+    cache = ClassificationCache()
+    size = entry_size(cache)
+    cache.set_max_memory(10.5 * size / (1024 * 1024))
+    for value in range(100):
+        cache.put(ClassificationCache.make_key(image(value)), ['good', np.float32(0.5)])
+        stats = cache.get_stats()
+        assert stats['memory'] <= stats['max_memory']
+    assert cache.get_stats()['entries'] == 10
+
+    # уменьшение ограничения сразу вытесняет лишнее
+    cache.set_max_memory(2.5 * size / (1024 * 1024))
+    stats = cache.get_stats()
+    assert stats['entries'] == 2
+    assert stats['memory'] <= stats['max_memory']
+
+def test_zero_memory_disables_cache():
+    cache = ClassificationCache(max_memory_mb=0)
+    key = ClassificationCache.make_key(image(0))
+    cache.put(key, ['good', np.float32(0.5)])
+    assert not cache.is_enabled()
+    assert cache.get(key) is None
+    assert cache.get_stats()['entries'] == 0
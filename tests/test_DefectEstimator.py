@@ -0,0 +1,35 @@
+from backend.DefectEstimator import DefectEstimator
+
+def sparse_classes(total, period=15, defect='glares'):
+    # один дефектный кадр на каждые period кадров
+    return [defect if index % period == period - 1 else 'good' for index in range(total)]
+
+def estimate(classes, seed, **params):
+    estimator = DefectEstimator(**params)
+    for index in DefectEstimator.sample_indices(len(classes), 'adaptive', seed=seed):
+        estimator.add(classes[index])
+        if estimator.is_confident():
+            break
+    return estimator
+
+def test_sparse_defect_is_found():
+    classes = sparse_classes(3000)
+    for seed in range(50):
+        estimator = estimate(classes, seed)
+        assert estimator.often_defect() == 'glares'
+
+def test_no_defect_stops_by_rule_of_three():
+    estimator = estimate(['good'] * 3000, seed=0, min_defect_rate=0.01)
+    assert estimator.often_defect() is None
+    assert estimator.sampled == 300
+
+def test_no_defect_without_min_rate_samples_everything():
+    estimator = estimate(['good'] * 500, seed=0, min_defect_rate=0)
+    assert estimator.sampled == 500
+    assert not estimator.is_confident()
+
+def test_leader_stops_early():
+    classes = ['noise' if index % 2 else 'blur' if index % 7 == 0 else 'good' for index in range(3000)]
+    estimator = estimate(classes, seed=0)
+    assert estimator.often_defect() == 'noise'
+    assert estimator.sampled < len(classes)
@@ -0,0 +1,58 @@
+import shutil
+from collections import namedtuple
+
+import numpy as np
+
+from backend.FrameSpillCache import FrameSpillCache
+
+def frames(count, shape=(48, 64, 3)):
+    rng = np.random.default_rng(0)
+    return [rng.integers(0, 256, shape, dtype=np.uint8) for _ in range(count)]
+
+def test_frames_are_read_back_unchanged():
+    source = frames(5) + [np.zeros((10, 20), dtype=np.uint8), np.ones((4, 4, 3), dtype=np.float32)]
+    with FrameSpillCache(limit_mb=1) as spill:
+        for frame in source:
+            assert spill.append(frame)
+        assert len(spill) == len(source)
+        restored = list(spill)
+        # повторное чтение дает те же кадры
+        assert all((first == second).all() for first, second in zip(restored, spill))
+
+    for frame, restored_frame in zip(source, restored):
+        assert restored_frame.shape == frame.shape
+        assert restored_frame.dtype == frame.dtype
+        assert (restored_frame == frame).all()
+
+def test_non_contiguous_frame_is_stored():
+    frame = frames(1, (48, 64, 3))[0][:, ::2]
+    with FrameSpillCache(limit_mb=1) as spill:
+        assert spill.append(frame)
+        assert (next(iter(spill)) == frame).all()
+
+def test_limit_keeps_continuous_prefix():
+    source = frames(10)
+    limit_mb = 3.5 * source[0].nbytes / (1024 * 1024)
+    with FrameSpillCache(limit_mb=limit_mb) as spill:
+        accepted = [spill.append(frame) for frame in source]
+        assert accepted == [True] * 3 + [False] * 7
+        assert spill.full
+        # после переполнения не принимаются даже кадры, которые поместились бы
+        assert not spill.append(np.zeros(1, dtype=np.uint8))
+        assert all((frame == restored).all() for frame, restored in zip(source, spill))
+        assert len(list(spill)) == 3
+
+def test_zero_limit_stores_nothing():
+    spill = FrameSpillCache(limit_mb=0)
+    assert spill.full
+    assert not spill.append(frames(1)[0])
+    assert list(spill) == []
+    spill.close()
+
+def test_limit_is_capped_by_free_disk_space(monkeypatch):
+    source = frames(10)
+    usage = namedtuple('usage', 'total used free')
+    # свободно 7 кадров: по умолчанию занимается не больше половины
+    monkeypatch.setattr(shutil, 'disk_usage', lambda path: usage(0, 0, 7 * source[0].nbytes))
+    with FrameSpillCache(limit_mb=1024) as spill:
+        assert [spill.append(frame) for frame in source] == [True] * 3 + [False] * 7
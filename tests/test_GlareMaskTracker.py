@@ -0,0 +1,49 @@
+import numpy as np
+
+from backend.GlareMaskTracker import GlareMaskTracker
+
+def frame(brightness=100):
+    rng = np.random.default_rng(0)
+    return np.clip(rng.normal(brightness, 5, (120, 160, 3)), 0, 255).astype(np.uint8)
+
+def process(tracker, image, key='mask'):
+    # маска строится заново (и запоминается), только если ее нельзя взять с прежних кадров
+    mask, _ = tracker.lookup(image, key)
+    if mask is not None:
+        return False
+    tracker.store(key, mask=np.zeros(image.shape[:2], dtype=np.uint8))
+    return True
+
+def test_mask_is_reused_for_similar_frames():
+    tracker = GlareMaskTracker(max_age=30)
+    computed = []
+    for _ in range(10):
+        computed.append(process(tracker, frame()))
+        tracker.next_frame()
+    assert computed == [True] + [False] * 9
+    assert tracker.stats['frames'] == 10
+
+def test_changed_frame_rebuilds_mask():
+    tracker = GlareMaskTracker(threshold=8.0)
+    assert process(tracker, frame(100))
+    tracker.next_frame()
+    assert process(tracker, frame(150))
+
+def test_age_counts_frames_not_lookups():
+    tracker = GlareMaskTracker(max_age=5)
+    image = frame()
+    assert process(tracker, image)
+    # на кадрах без бликов маска не запрашивается, но стареет
+    for _ in range(5):
+        tracker.next_frame()
+    assert process(tracker, image)
+
+def test_several_lookups_in_one_frame_do_not_age_mask():
+    tracker = GlareMaskTracker(max_age=2)
+    image = frame()
+    assert process(tracker, image)
+    assert [process(tracker, image) for _ in range(5)] == [False] * 5
+    tracker.next_frame()
+    assert not process(tracker, image)
+    tracker.next_frame()
+    assert process(tracker, image)
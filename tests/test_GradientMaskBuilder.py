@@ -0,0 +1,61 @@
+import cv2
+import numpy as np
+import pytest
+
+from backend.GradientMaskBuilder import GradientMaskBuilder
+
+def reference_mask(channel, gradient_method, gradient_threshold):
+    # прежнее построение маски (градиент в float64)
+    if gradient_method == 'sobel':
+        grad_x = cv2.Sobel(channel, cv2.CV_64F, 1, 0, ksize=3)
+        grad_y = cv2.Sobel(channel, cv2.CV_64F, 0, 1, ksize=3)
+        gradient = np.sqrt(grad_x**2 + grad_y**2)
+    elif gradient_method == 'scharr':
+        grad_x = cv2.Scharr(channel, cv2.CV_64F, 1, 0)
+        grad_y = cv2.Scharr(channel, cv2.CV_64F, 0, 1)
+        gradient = np.sqrt(grad_x**2 + grad_y**2)
+    elif gradient_method == 'laplacian':
+        gradient = cv2.Laplacian(channel, cv2.CV_64F)
+    gradient = cv2.normalize(gradient, None, 0, 255, cv2.NORM_MINMAX, cv2.CV_8U)
+    _, gradient_mask = cv2.threshold(gradient, gradient_threshold, 255, cv2.THRESH_BINARY)
+    return gradient_mask
+
+def channels():
+    rng = np.random.default_rng(0)
+    smooth = cv2.GaussianBlur((rng.random((240, 320)) * 255).astype(np.uint8), (0, 0), 2)
+    cv2.circle(smooth, (100, 100), 20, 255, -1)
+    noise = (rng.random((240, 320)) * 255).astype(np.uint8)
+    return [smooth, noise]
+
+@pytest.mark.parametrize('gradient_method', ['sobel', 'scharr', 'laplacian'])
+def test_mask_matches_float64_reference(gradient_method):
+    builder = GradientMaskBuilder()
+    for channel in channels():
+        for gradient_threshold in [10, 50, 100]:
+            mask = builder.build(channel, gradient_method, gradient_threshold)
+            assert mask.dtype == np.uint8
+            assert (mask == reference_mask(channel, gradient_method, gradient_threshold)).all()
+
+def test_buffers_are_reset_on_size_change():
+    builder = GradientMaskBuilder()
+    large, small = channels()[0], channels()[1][:100, :150]
+    builder.build(large, 'sobel', 50)
+    assert (builder.build(small, 'sobel', 50) == reference_mask(small, 'sobel', 50)).all()
+    assert (builder.build(large, 'sobel', 50) == reference_mask(large, 'sobel', 50)).all()
+
+def test_masks_are_not_shared_between_calls():
+    builder = GradientMaskBuilder()
+    smooth, noise = channels()
+    first = builder.build(smooth, 'sobel', 50)
+    builder.build(noise, 'sobel', 50)
+    assert (first == reference_mask(smooth, 'sobel', 50)).all()
+
+@pytest.mark.parametrize('gradient_method', ['sobel', 'scharr'])
+def test_l1_magnitude_is_close_to_reference(gradient_method):
+    channel = channels()[0]
+    mask = GradientMaskBuilder('l1').build(channel, gradient_method, 50)
+    assert (mask != reference_mask(channel, gradient_method, 50)).mean() < 0.01
+
+def test_unknown_gradient_method():
+    with pytest.raises(ValueError):
+        GradientMaskBuilder().build(channels()[0], 'prewitt', 50)
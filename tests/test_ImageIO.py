@@ -0,0 +1,88 @@
+import cv2
+import numpy as np
+import pytest
+
+from backend.ImageIO import ImageReader, ImageWriter, imread_unicode, imwrite_unicode
+
+def sample_image():
+    rng = np.random.default_rng(0)
+    return rng.integers(0, 256, (120, 160, 3), dtype=np.uint8)
+
+@pytest.mark.parametrize('mmap_threshold_mb', [64, 0])
+def test_read_matches_imread(tmp_path, mmap_threshold_mb):
+    image = sample_image()
+    path = tmp_path / 'image.png'
+    cv2.imwrite(str(path), image)
+
+    reader = ImageReader(mmap_threshold_mb=mmap_threshold_mb)
+    restored = reader.read(str(path))
+    assert (restored == cv2.imread(str(path))).all()
+    assert (restored == image).all()
+    assert reader.read(str(path), cv2.IMREAD_GRAYSCALE).shape == image.shape[:2]
+
+def test_read_unicode_path(tmp_path):
+    image = sample_image()
+    path = tmp_path / 'изображение.png'
+    path.write_bytes(cv2.imencode('.png', image)[1].tobytes())
+    assert (ImageReader().read(str(path)) == image).all()
+
+def test_buffer_is_reused_for_smaller_files(tmp_path):
+    large = sample_image()
+    small = large[:20, :20].copy()
+    cv2.imwrite(str(tmp_path / 'large.png'), large)
+    cv2.imwrite(str(tmp_path / 'small.png'), small)
+
+    reader = ImageReader()
+    assert (reader.read(str(tmp_path / 'large.png')) == large).all()
+    # остаток прежнего файла в буфере не должен попасть в декодирование
+    assert (reader.read(str(tmp_path / 'small.png')) == small).all()
+
+@pytest.mark.parametrize('mmap_threshold_mb', [64, 0])
+def test_unreadable_files_return_none(tmp_path, mmap_threshold_mb):
+    reader = ImageReader(mmap_threshold_mb=mmap_threshold_mb)
+    (tmp_path / 'empty.png').write_bytes(b'')
+    (tmp_path / 'broken.png').write_bytes(b'not an image')
+    assert reader.read(str(tmp_path / 'missing.png')) is None
+    assert reader.read(str(tmp_path / 'empty.png')) is None
+    assert reader.read(str(tmp_path / 'broken.png')) is None
+
+def test_mmap_decoding_error_is_not_hidden(tmp_path):
+    path = tmp_path / 'image.png'
+    cv2.imwrite(str(path), sample_image())
+    # некорректный флаг: ошибка OpenCV, а не BufferError при закрытии mmap
+    with pytest.raises(cv2.error):
+        ImageReader(mmap_threshold_mb=0).read(str(path), -5)
+
+def test_write_read_lossless_round_trip(tmp_path):
+    image = sample_image()
+    for name in ['image.png', 'изображение.png', 'image.bmp']:
+        path = tmp_path / name
+        assert imwrite_unicode(str(path), image)
+        assert (imread_unicode(str(path)) == image).all()
+
+def test_encode_matches_imencode():
+    image = sample_image()
+    writer = ImageWriter(jpeg_quality=80, png_compression=3)
+    assert writer.encode(image, '.jpg').tobytes() == cv2.imencode('.jpg', image, [cv2.IMWRITE_JPEG_QUALITY, 80])[1].tobytes()
+    assert writer.encode(image, '.PNG').tobytes() == cv2.imencode('.png', image, [cv2.IMWRITE_PNG_COMPRESSION, 3])[1].tobytes()
+
+def test_jpeg_round_trip_keeps_quality(tmp_path):
+    image = cv2.GaussianBlur(sample_image(), (0, 0), 3)
+    path = tmp_path / 'image.jpg'
+    assert ImageWriter(jpeg_quality=95).write(str(path), image)
+    restored = imread_unicode(str(path))
+    assert restored.shape == image.shape
+    assert np.abs(restored.astype(np.int16) - image).mean() < 2
+
+def test_unknown_extension_is_encoded_as_jpeg(tmp_path):
+    path = tmp_path / 'image.unknown'
+    assert imwrite_unicode(str(path), sample_image())
+    assert path.read_bytes()[:2] == b'\xff\xd8'
+
+def test_write_replaces_file_without_leftovers(tmp_path):
+    path = tmp_path / 'image.png'
+    path.write_bytes(b'old')
+    image = sample_image()
+    assert imwrite_unicode(str(path), image)
+    assert (imread_unicode(str(path)) == image).all()
+    assert [item.name for item in tmp_path.iterdir()] == ['image.png']
@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+
+from backend.ImageMetrics import fast_noise_sigma, compare_noise_estimators, thumbnail
+
+NOISE_LEVELS = [0, 3, 6, 9, 12, 15, 20, 25, 30, 40, 50]
+
+def noisy_images():
+    data = pytest.importorskip('skimage.data')
+    import cv2
+    rng = np.random.default_rng(0)
+    images = []
+    for base in [data.astronaut(), data.coffee(), data.chelsea(), np.dstack([data.camera()] * 3)]:
+        base = cv2.resize(cv2.cvtColor(base, cv2.COLOR_RGB2BGR), (640, 480))
+        for sigma in NOISE_LEVELS:
+            images.append(np.clip(base + rng.normal(0, sigma, base.shape), 0, 255).astype(np.uint8))
+    return images
+
+def test_fast_noise_sigma_agrees_with_skimage():
+    pytest.importorskip('skimage.restoration')
+    report = compare_noise_estimators(noisy_images())
+    assert report['samples'] == 4 * len(NOISE_LEVELS)
+    assert report['correlation'] > 0.999
+    assert report['mean_abs_diff'] < 1.0
+    assert report['max_abs_diff'] < 2.5
+    assert report['same_kernel'] >= 0.9
+
+def test_fast_noise_sigma_tracks_added_noise():
+    rng = np.random.default_rng(1)
+    flat = np.full((480, 640), 128.0)
+    for sigma in [5, 10, 20]:
+        image = np.clip(flat + rng.normal(0, sigma, flat.shape), 0, 255).astype(np.uint8)
+        assert fast_noise_sigma(image) == pytest.approx(sigma, rel=0.05)
+
+def test_thumbnail_shape_and_type():
+    image = np.zeros((1080, 1920, 3), dtype=np.uint8)
+    small = thumbnail(image)
+    assert small.shape == (36, 64)
+    assert small.dtype == np.int16
@@ -0,0 +1,44 @@
+import cv2
+import numpy as np
+import pytest
+
+from backend.RegionInpaint import inpaint_regions
+
+def sample_image():
+    rng = np.random.default_rng(0)
+    return cv2.GaussianBlur((rng.random((480, 640, 3)) * 255).astype(np.uint8), (0, 0), 3)
+
+def circles_mask(circles, shape=(480, 640)):
+    mask = np.zeros(shape, dtype=np.uint8)
+    for x, y, radius in circles:
+        cv2.circle(mask, (x, y), radius, 255, -1)
+    return mask
+
+# близкие области (сливаются в одну), области у краев кадра и одиночный маленький блик
+GLARES = [(100, 100, 12), (130, 110, 8), (400, 300, 15), (600, 460, 10), (5, 5, 6), (320, 240, 3)]
+
+@pytest.mark.parametrize('flags', [cv2.INPAINT_NS, cv2.INPAINT_TELEA])
+@pytest.mark.parametrize('inpaint_radius', [1, 3, 7])
+def test_matches_full_frame_inpaint(flags, inpaint_radius):
+    image = sample_image()
+    mask = circles_mask(GLARES)
+    result = inpaint_regions(image, mask, inpaint_radius, flags)
+    assert (result == cv2.inpaint(image, mask, inpaintRadius=inpaint_radius, flags=flags)).all()
+    # пиксели вне маски не меняются
+    assert (result[mask == 0] == image[mask == 0]).all()
+
+def test_gray_image():
+    image = cv2.cvtColor(sample_image(), cv2.COLOR_BGR2GRAY)
+    mask = circles_mask(GLARES)
+    assert (inpaint_regions(image, mask, 3, cv2.INPAINT_TELEA) == cv2.inpaint(image, mask, 3, cv2.INPAINT_TELEA)).all()
+
+def test_large_mask_falls_back_to_full_frame():
+    image = sample_image()
+    mask = circles_mask([(x, y, 10) for x in range(20, 640, 60) for y in range(20, 480, 60)])
+    assert (inpaint_regions(image, mask, 3, cv2.INPAINT_NS) == cv2.inpaint(image, mask, 3, cv2.INPAINT_NS)).all()
+
+def test_empty_mask_returns_copy():
+    image = sample_image()
+    result = inpaint_regions(image, np.zeros(image.shape[:2], dtype=np.uint8), 3, cv2.INPAINT_NS)
+    assert result is not image
+    assert (result == image).all()
@@ -0,0 +1,58 @@
+import cv2
+import numpy as np
+
+from backend.TemporalEqualizer import equalization_lut, TemporalEqualizer
+
+def lut_table(lut):
+    return np.clip(np.rint(lut), 0, 255).astype(np.uint8)
+
+def random_channels(count=300):
+    rng = np.random.default_rng(0)
+    for _ in range(count):
+        low, high = sorted(rng.integers(0, 256, 2))
+        shape = rng.integers(1, 200, 2)
+        yield rng.integers(low, high + 1, shape, dtype=np.uint8)
+
+def test_lut_matches_equalize_hist():
+    for channel in random_channels():
+        assert (cv2.LUT(channel, lut_table(equalization_lut(channel))) == cv2.equalizeHist(channel)).all()
+
+def test_lut_of_constant_channel():
+    for value in [0, 17, 255]:
+        channel = np.full((10, 10), value, dtype=np.uint8)
+        assert (cv2.LUT(channel, lut_table(equalization_lut(channel))) == cv2.equalizeHist(channel)).all()
+
+def frames(count, brightness=100):
+    rng = np.random.default_rng(1)
+    base = cv2.GaussianBlur(rng.integers(0, 256, (120, 160), dtype=np.uint8), (0, 0), 3)
+    return [cv2.add(base, int(brightness + index % 3)) for index in range(count)]
+
+def test_first_frame_is_equalized_exactly():
+    frame = frames(1)[0]
+    assert (TemporalEqualizer().apply(frame) == cv2.equalizeHist(frame)).all()
+
+def test_lut_is_updated_every_interval_frames():
+    equalizer = TemporalEqualizer(interval=10)
+    for frame in frames(25):
+        equalizer.apply(frame)
+    assert equalizer.stats == {'frames': 25, 'updates': 3, 'scene_changes': 1}
+
+def test_alpha_one_equalizes_each_update_exactly():
+    equalizer = TemporalEqualizer(interval=1, alpha=1.0)
+    for frame in frames(5):
+        assert (equalizer.apply(frame) == cv2.equalizeHist(frame)).all()
+
+def test_scene_change_resets_lut():
+    equalizer = TemporalEqualizer(interval=100, alpha=0.3)
+    for frame in frames(5, brightness=20):
+        equalizer.apply(frame)
+    bright = frames(1, brightness=150)[0]
+    assert (equalizer.apply(bright) == cv2.equalizeHist(bright)).all()
+    assert equalizer.stats['scene_changes'] == 2
+
+def test_keys_have_separate_luts():
+    equalizer = TemporalEqualizer(interval=100)
+    dark, bright = frames(1, brightness=20)[0], frames(1, brightness=150)[0]
+    equalizer.apply(dark, key='yuv')
+    assert (equalizer.apply(bright, key='hsv') == cv2.equalizeHist(bright)).all()
+    assert (equalizer.apply(dark, key='yuv') == cv2.equalizeHist(dark)).all()
@@ -0,0 +1,66 @@
+import random
+import threading
+import time
+
+import pytest
+
+from backend.VideoPipeline import VideoPipeline
+
+def slow_square(item):
+    # разное время обработки перемешивает порядок завершения в пуле
+    time.sleep(random.Random(item).random() * 0.005)
+    return item * item
+
+@pytest.mark.parametrize('workers, queue_size', [(1, 1), (4, 2), (8, 16)])
+def test_results_are_written_in_input_order(workers, queue_size):
+    written = []
+    VideoPipeline(workers=workers, queue_size=queue_size).run(range(100), slow_square, written.append)
+    assert written == [item * item for item in range(100)]
+
+def test_empty_input():
+    written = []
+    VideoPipeline(workers=2).run([], slow_square, written.append)
+    assert written == []
+
+def test_queues_limit_items_in_flight():
+    read = []
+    written = []
+    in_flight = []
+
+    def items():
+        for item in range(50):
+            read.append(item)
+            in_flight.append(len(read) - len(written))
+            yield item
+
+    VideoPipeline(workers=2, queue_size=2).run(items(), slow_square, written.append)
+    assert written == [item * item for item in range(50)]
+    # очередь чтения, очередь результатов и элементы в руках стадий
+    assert max(in_flight) <= 2 + 2 + 3
+
+@pytest.mark.parametrize('stage', ['read', 'process', 'write'])
+def test_error_in_any_stage_is_raised(stage):
+    class StageError(Exception):
+        pass
+
+    def items():
+        for item in range(1000):
+            if stage == 'read' and item == 10: raise StageError(stage)
+            yield item
+
+    def process(item):
+        if stage == 'process' and item == 10: raise StageError(stage)
+        return item
+
+    written = []
+    def write(result):
+        if stage == 'write' and result == 10: raise StageError(stage)
+        written.append(result)
+
+    threads = threading.active_count()
+    with pytest.raises(StageError, match=stage):
+        VideoPipeline(workers=3, queue_size=2).run(items(), process, write)
+    # конвейер остановлен: записано только начало без пропусков, потоки завершены
+    assert written == list(range(len(written)))
+    assert len(written) <= 10
+    assert threading.active_count() == threads
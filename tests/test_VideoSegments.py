@@ -0,0 +1,32 @@
+import pytest
+
+from backend.VideoSegments import split_segments
+
+def lengths(segments, total_frames):
+    ends = [end if end is not None else total_frames for _, end in segments]
+    return [end - start for (start, _), end in zip(segments, ends)]
+
+@pytest.mark.parametrize('total_frames, workers, min_segment_frames', [
+    (100, 4, 10), (101, 4, 10), (13, 3, 4), (11, 4, 3), (1000, 7, 1), (30, 8, 10), (5, 2, 1)
+])
+def test_segments_cover_video_without_gaps(total_frames, workers, min_segment_frames):
+    segments = split_segments(total_frames, workers, min_segment_frames)
+    assert 1 <= len(segments) <= workers
+    assert segments[0][0] == 0
+    # последний сегмент читается до конца видео
+    assert segments[-1][1] is None
+    for (_, end), (next_start, _) in zip(segments, segments[1:]):
+        assert end == next_start
+    assert sum(lengths(segments, total_frames)) == total_frames
+    assert min(lengths(segments, total_frames)) >= min(min_segment_frames, total_frames)
+    assert max(lengths(segments, total_frames)) - min(lengths(segments, total_frames)) <= 1
+
+def test_segment_count():
+    assert split_segments(100, 4, 10) == [(0, 25), (25, 50), (50, 75), (75, None)]
+    # сегментов не больше, чем помещается кадров по min_segment_frames
+    assert len(split_segments(100, 8, 30)) == 3
+    assert split_segments(13, 3, 4) == [(0, 4), (4, 8), (8, None)]
+
+@pytest.mark.parametrize('total_frames', [0, 1, 9])
+def test_short_video_is_one_segment(total_frames):
+    assert split_segments(total_frames, 4, 10) == [(0, None)]